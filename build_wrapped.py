@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+CTF Wrapped Build - Single-Process Pipeline
+Streams player records from the raw CTF exports straight into card rendering,
+page generation, the index and precompression. player_data.csv is only written
+on request.
+"""
+
+import argparse
+import os
+import time
+
+import generate_html_pages as pages
+import generate_index as index
+import personalize_cards_v2 as cards
+import precompress
+import process_ctf_data as data
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+# Optional side output, where the standalone card/page/index scripts look for it
+OUTPUT_CSV = os.path.join(BASE_PATH, "player_data.csv")
+
+HTML_TEMPLATE = os.path.join(BASE_PATH, "wrapped_template.html")
+PAGES_FOLDER = os.path.join(BASE_PATH, "wrapped_pages")
+
+# ============================================
+# PIPELINE
+# ============================================
+
+def player_records(output_df):
+    """
+    Player rows as dicts of strings, exactly as csv.DictReader would return
+    them from player_data.csv (missing values become empty strings)
+    """
+    values = output_df.astype(object).where(output_df.notna(), "")
+    return [{column: str(value) for column, value in row.items()}
+            for row in values.to_dict('records')]
+
+def export_paths(event_dir=None):
+    """
+    Raw export locations: process_ctf_data.py's defaults resolved against this
+    folder (not the working directory), or an event folder laid out as in
+    batch mode
+
+    Returns:
+        (users, submissions, scoreboard, challenges, parse cache dir)
+    """
+    if event_dir is None:
+        names = [data.USERS_CSV, data.SUBMISSIONS_CSV, data.SCOREBOARD_CSV, data.CHALLENGES_CSV, data.PARSE_CACHE_DIR]
+        return [os.path.normpath(os.path.join(BASE_PATH, name)) for name in names]
+    names = [data.EVENT_USERS_CSV, data.EVENT_SUBMISSIONS_CSV, data.EVENT_SCOREBOARD_CSV,
+             data.EVENT_CHALLENGES_CSV, ".ctf_cache"]
+    return [os.path.join(event_dir, name) for name in names]
+
+def build(event_dir=None, output_csv=None, workers=1, force=False, cache=True, compress=True):
+    """
+    Run aggregation, cards, pages, index and precompression in one process
+
+    Args:
+        event_dir: Folder with users.csv, submissions.csv, ... (None = the
+            paths process_ctf_data.py uses)
+        output_csv: Also write player_data.csv here (None = don't)
+        workers: Card render processes (0 = every CPU core)
+        force: Re-render every card and page, ignoring their manifests
+        cache: Use the parsed-CSV snapshot cache
+        compress: Write .gz/.br siblings for the site's text assets
+
+    Returns:
+        List of (stage, seconds), or None if the exports or the page
+        template could not be read, or the card renderer could not start
+    """
+    timings = []
+
+    def stage(name, func, *args, **kwargs):
+        print("\n" + "=" * 70)
+        print(f"▶ {name.upper()}")
+        print("=" * 70)
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        timings.append((name, time.perf_counter() - start))
+        return result
+
+    users_csv, submissions_csv, scoreboard_csv, challenges_csv, cache_dir = export_paths(event_dir)
+    try:
+        output_df = stage(
+            "aggregate", data.process_event,
+            users_csv, submissions_csv, scoreboard_csv, output_csv,
+            chunk_size=data.SUBMISSIONS_CHUNK_SIZE,
+            cache_dir=cache_dir if cache else None,
+            challenges_csv=challenges_csv,
+        )
+    except data.ExportReadError as e:
+        print(f"  ❌ {e}")
+        return None
+    players = player_records(output_df)
+
+    # None means the renderer could not start (e.g. no card_bg.png in template
+    # mode); pages and index would link missing or stale cards
+    if stage("cards", cards.render_cards, players, workers, force) is None:
+        print("  ❌ Card stage failed - stopping the build")
+        return None
+
+    template = pages.load_template(HTML_TEMPLATE)
+    if template is None:
+        return None
+    stage("pages", pages.generate_pages, players, template, cards.OUTPUT_FOLDER, PAGES_FOLDER, pages.BASE_URL, force)
+
+    index_path = stage("index", index.write_index, players, PAGES_FOLDER)
+    print(f"  ✓ Index: {index_path}")
+
+    if compress:
+        # Compression always spreads across every core; --workers sizes the card pool
+        stage("precompress", precompress.precompress_site, PAGES_FOLDER, 0, force=force)
+    return timings
+
+def main(event_dir=None, output_csv=None, workers=1, force=False, cache=True, compress=True):
+    print("=" * 70)
+    print("CTF WRAPPED BUILD - exports → cards → pages → index → precompress")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    timings = build(event_dir, output_csv, workers, force, cache, compress)
+    if timings is None:
+        return
+    total = time.perf_counter() - start
+
+    print("\n" + "=" * 70)
+    print("⏱️  STAGE TIMES:")
+    for name, seconds in timings:
+        print(f"  {name:12s} {seconds:8.2f}s")
+    print(f"  {'total':12s} {total:8.2f}s")
+    print("=" * 70)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build cards, pages and index straight from the CTF exports")
+    parser.add_argument("--event", default=None,
+                        help="folder with users.csv, submissions.csv, scoreboard.csv "
+                             "(default: the exports process_ctf_data.py reads from ..)")
+    parser.add_argument("--csv", nargs="?", const=OUTPUT_CSV, default=None, metavar="PATH",
+                        help="also write player_data.csv (default path: next to this script)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="card render processes (0 = every CPU core)")
+    parser.add_argument("--mode", choices=["procedural", "template"], default=cards.RENDER_MODE,
+                        help="card render mode")
+    parser.add_argument("--force", action="store_true",
+                        help="re-render every card and page, ignoring their manifests")
+    parser.add_argument("--io-threads", type=int, default=cards.IO_THREADS,
+                        help="threads writing cards and pages (0 = write synchronously)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="re-parse the exports instead of using the .ctf_cache snapshots")
+    parser.add_argument("--no-precompress", action="store_true",
+                        help="skip writing .gz/.br siblings for wrapped_pages")
+    args = parser.parse_args()
+    cards.RENDER_MODE = args.mode
+    cards.IO_THREADS = pages.IO_THREADS = args.io_threads
+    main(args.event, args.csv, args.workers, args.force, cache=not args.no_cache, compress=not args.no_precompress)
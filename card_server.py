@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+CTF Wrapped Card Server
+Renders /{username}_card.png on first request from player_data.csv instead of
+pre-rendering every card, keeping recently served cards in a bounded LRU.
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import personalize_cards_v2 as cards
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+HOST = "127.0.0.1"
+PORT = 8000
+CSV_FILE = cards.CSV_FILE
+
+# Upper bound on encoded card bytes held in memory
+CACHE_BYTES = 64 * 1024 * 1024
+
+CONTENT_TYPES = {"png": "image/png", "webp": "image/webp", "avif": "image/avif"}
+CARD_ROUTE = re.compile(r"^/(.+)_card\.(png|webp|avif)$")
+
+# ============================================
+# CARD CACHE
+# ============================================
+
+class CardCache:
+    """
+    Size-bounded LRU of encoded cards with single-flight rendering
+
+    A miss registers a Future for its key; concurrent requests for the same
+    key wait on it instead of rendering the card again.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.size = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evictions = 0
+
+    def get(self, key, render):
+        """
+        Return the cached bytes for key, calling render() once on a miss
+
+        Args:
+            key: Hashable cache key
+            render: Zero-argument callable producing the encoded bytes
+
+        Returns:
+            Encoded card bytes
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            future = self.inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self.inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            data = render()
+        except Exception as e:
+            with self.lock:
+                del self.inflight[key]
+            future.set_exception(e)
+            raise
+
+        with self.lock:
+            del self.inflight[key]
+            if len(data) <= self.max_bytes:
+                self.entries[key] = data
+                self.size += len(data)
+                while self.size > self.max_bytes:
+                    _, evicted = self.entries.popitem(last=False)
+                    self.size -= len(evicted)
+                    self.evictions += 1
+        future.set_result(data)
+        return data
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses + self.shared
+            return {
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'shared_renders': self.shared,
+                'evictions': self.evictions,
+                'hit_rate': round((self.hits + self.shared) / lookups, 4) if lookups else 0.0,
+            }
+
+# ============================================
+# PLAYER DATA
+# ============================================
+
+class PlayerIndex:
+    """player_data.csv rows by username, reloaded when the file changes"""
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = None
+        self.players = {}
+        self.lock = threading.Lock()
+
+    def get(self, username):
+        mtime = os.stat(self.path).st_mtime_ns
+        with self.lock:
+            if mtime != self.mtime:
+                with open(self.path, mode='r', encoding='utf-8') as f:
+                    self.players = {row['Username']: row for row in csv.DictReader(f)}
+                self.mtime = mtime
+            return self.players.get(username)
+
+# ============================================
+# HTTP SERVER
+# ============================================
+
+# Pillow drawing isn't documented as thread-safe; cache hits are still served concurrently
+_RENDER_LOCK = threading.Lock()
+
+def make_handler(players, cache, signature):
+    class CardHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = unquote(self.path.split("?", 1)[0])
+            if path == "/stats":
+                self.send_body(200, "application/json", json.dumps(cache.stats(), indent=2).encode('utf-8'))
+                return
+
+            match = CARD_ROUTE.match(path)
+            if not match:
+                self.send_error(404)
+                return
+            username, fmt = match.groups()
+            player = players.get(username)
+            if player is None:
+                # Names only go in the body: the status line is latin-1 and must not carry CR/LF
+                self.send_text(404, f"Unknown player {username}")
+                return
+
+            def render():
+                with _RENDER_LOCK:
+                    return cards.render_card_bytes(player, fmt)
+
+            # The row hash keys the cache, so an edited player_data.csv is never served stale
+            key = (cards.card_key(player, signature), fmt)
+            try:
+                data = cache.get(key, render)
+            except Exception as e:
+                self.send_text(500, f"{type(e).__name__}: {e}")
+                return
+            self.send_body(200, CONTENT_TYPES[fmt], data)
+
+        def send_text(self, status, text):
+            self.send_body(status, "text/plain; charset=utf-8", (text + "\n").encode('utf-8'))
+
+        def send_body(self, status, content_type, body):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return CardHandler
+
+def main(host=HOST, port=PORT, cache_bytes=CACHE_BYTES):
+    print("=" * 60)
+    print("CTF WRAPPED CARD SERVER")
+    print("=" * 60)
+
+    if not os.path.exists(CSV_FILE):
+        print(f"  ❌ Error: File '{CSV_FILE}' not found!")
+        return
+
+    fonts = cards.preload_fonts()
+    cards.get_static_layer()
+    for fmt in [fmt for fmt in cards.CARD_FORMATS if fmt != "png"]:
+        if not cards.features.check(fmt):
+            print(f"  ⚠️  Pillow was built without {fmt.upper()} support - /*_card.{fmt} disabled")
+    signature = cards.renderer_signature(fonts)
+
+    players = PlayerIndex(CSV_FILE)
+    cache = CardCache(cache_bytes)
+    server = ThreadingHTTPServer((host, port), make_handler(players, cache, signature))
+    print(f"🚀 Serving cards from {CSV_FILE} at http://{host}:{port}/{{username}}_card.png")
+    print(f"   Cache: {cache_bytes / 1024 / 1024:.0f} MB, counters at /stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    stats = cache.stats()
+    print("-" * 60)
+    print(f"📊 {stats['hits']} hits, {stats['misses']} misses, {stats['shared_renders']} shared renders, "
+          f"{stats['evictions']} evictions ({stats['hit_rate']:.0%} hit rate)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve wrapped cards rendered on demand")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--cache-mb", type=float, default=CACHE_BYTES / 1024 / 1024,
+                        help="memory bound for cached cards")
+    args = parser.parse_args()
+    main(args.host, args.port, int(args.cache_mb * 1024 * 1024))
@@ -4,11 +4,24 @@ CTF Wrapped HTML Generator - Professional Edition (No Emojis)
 Generates personalized HTML pages for each player using built-in csv module
 """
 
+import argparse
 import csv
+import hashlib
+import html
+import json
 import os
+import re
 import shutil
+import threading
 from pathlib import Path
 
+import write_pool
+
+try:
+    import fcntl
+except ImportError:  # Windows - no reflinks
+    fcntl = None
+
 # ============================================
 # CONFIGURATION
 # ============================================
@@ -17,11 +30,38 @@ from pathlib import Path
 CSV_FILE = "player_data.csv"
 HTML_TEMPLATE = "wrapped_template.html"
 CARDS_FOLDER = "personalized_cards"
+# Card formats personalize_cards_v2.py can produce (see CARD_FORMAT there)
+CARD_EXTENSIONS = (".png", ".webp", ".avif")
+# Derivatives rendered alongside each card: 1200x630 og:image and index thumbnail
+DERIVATIVE_KINDS = ("share", "thumb")
 
 # Output
 OUTPUT_FOLDER = "wrapped_pages"
 BASE_URL = "https://cybercom-ctf-wrapped.netlify.app"
 
+# Per-page input hashes, kept beside (not inside) the deployed OUTPUT_FOLDER;
+# pages whose inputs are unchanged are not rewritten
+PAGES_MANIFEST = ".wrapped_pages_manifest.json"
+
+# Publish cards into OUTPUT_FOLDER/cards as hardlinks (or reflinks) where the
+# filesystem allows; False always writes independent copies
+LINK_CARDS = True
+
+# Threads writing pages and publishing cards (0 = write synchronously)
+IO_THREADS = write_pool.WRITE_THREADS
+
+# Linux ioctl that clones a file copy-on-write (btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+# Placeholders generate_html_page fills in; every value is HTML-escaped
+# except the ones in RAW_PLACEHOLDERS, which are already markup
+PLACEHOLDERS = (
+    'USERNAME', 'ARCHETYPE', 'ARCHETYPE_DESCRIPTION', 'CARD_URL', 'CARD_EXT', 'SHARE_URL',
+    'SOLVED', 'TOTAL', 'RANK', 'TIME', 'CATEGORY', 'BADGES_HTML', 'PAGE_URL',
+)
+RAW_PLACEHOLDERS = {'BADGES_HTML'}
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([A-Za-z0-9_]+)\}\}")
+
 # ============================================
 # ARCHETYPE DESCRIPTIONS
 # ============================================
@@ -36,6 +76,190 @@ ARCHETYPE_DESCRIPTIONS = {
     "The Slow Burn": "You started slow. Like, really slow. First few challenges took you forever, and honestly, it looked rough. But then something clicked. Maybe you figured out the pattern. Maybe you learned a new technique. Maybe you just got mad enough to push through. Whatever it was, you started picking up speed. Each solve came faster than the last. You finished strong. That's growth in real-time. That's what learning looks like. While others plateaued, you kept improving. Your graph wasn't a spike - it was a curve, steadily climbing. You proved something important: starting slow doesn't mean finishing slow. Momentum builds. Skills compound. And sometimes the best way to win is to just keep showing up until you figure it out. You didn't give up when it was hard. And that's everything. 🔥"
 }
 
+# ============================================
+# PAGE TEMPLATE
+# ============================================
+
+def compile_template(template_html):
+    """
+    Split the page template into static segments and placeholder slots
+
+    A page is segments[0] + value(slots[0]) + segments[1] + ... so rendering
+    is a single join instead of one replace pass per placeholder.
+
+    Returns:
+        (segments, slots)
+
+    Raises:
+        ValueError: The template uses a placeholder generate_html_page never fills
+    """
+    parts = PLACEHOLDER_PATTERN.split(template_html)
+    segments, slots = parts[0::2], parts[1::2]
+
+    unknown = sorted(set(slots) - set(PLACEHOLDERS))
+    if unknown:
+        raise ValueError("unknown placeholder(s) " + ", ".join(f"{{{{{name}}}}}" for name in unknown))
+    return segments, slots
+
+def load_template(path):
+    """
+    Read and compile the page template, reporting placeholder problems
+
+    Returns:
+        Compiled template, or None if it can't be used
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            template_html = f.read()
+        segments, slots = compile_template(template_html)
+    except FileNotFoundError:
+        print(f"  ❌ Error: Template file '{path}' not found!")
+        return None
+    except ValueError as e:
+        print(f"  ❌ Error: Template '{path}' has {e}")
+        return None
+
+    print(f"  ✓ Template loaded ({len(slots)} slots)")
+    for name in PLACEHOLDERS:
+        if name not in slots:
+            print(f"  ⚠️  Template never uses {{{{{name}}}}}")
+    return segments, slots
+
+def render_template(template, values):
+    """Fill a compiled template; values maps placeholder name -> text"""
+    segments, slots = template
+    parts = [segments[0]]
+    for name, segment in zip(slots, segments[1:]):
+        parts.append(values[name])
+        parts.append(segment)
+    return "".join(parts)
+
+# ============================================
+# CARD PUBLISHING
+# ============================================
+
+# Files and bytes handled by publish_file in this run
+PUBLISH_STATS = {'copied': 0, 'linked': 0, 'skipped': 0,
+                 'copied_bytes': 0, 'linked_bytes': 0, 'skipped_bytes': 0}
+# publish_file runs on the write pool's threads
+_PUBLISH_LOCK = threading.Lock()
+
+def same_file(src, dest, src_stat):
+    """True if dest already holds src's contents (same inode, size+mtime, or hash)"""
+    try:
+        dest_stat = os.stat(dest)
+    except FileNotFoundError:
+        return False
+    if (src_stat.st_dev, src_stat.st_ino) == (dest_stat.st_dev, dest_stat.st_ino):
+        return True
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    if src_stat.st_mtime_ns == dest_stat.st_mtime_ns:
+        return True
+    if write_pool.file_digest(src) != write_pool.file_digest(dest):
+        return False
+    # Identical bytes, stale mtime - sync it so the next run skips on stat alone
+    os.utime(dest, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+    return True
+
+def reflink(src, dest):
+    """Copy-on-write clone of src; raises OSError where unsupported"""
+    if fcntl is None:
+        raise OSError("reflinks are not supported on this platform")
+    try:
+        with open(src, 'rb') as s, open(dest, 'wb') as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    except OSError:
+        if os.path.exists(dest):
+            os.remove(dest)
+        raise
+    shutil.copystat(src, dest)
+
+def publish_file(src, dest):
+    """
+    Make dest hold src's contents, doing as little I/O as possible
+
+    Identical files are skipped; otherwise dest becomes a hardlink, then a
+    reflink, and only then a full copy (shutil.copy2). An identical dest that
+    is no longer src's inode (the card was re-rendered, which replaces the
+    file) is hardlinked again where possible.
+
+    Returns:
+        "skipped", "linked" or "copied"
+    """
+    src_stat = os.stat(src)
+    if same_file(src, dest, src_stat):
+        action = "skipped"
+        dest_stat = os.stat(dest)
+        if LINK_CARDS and (src_stat.st_dev, src_stat.st_ino) != (dest_stat.st_dev, dest_stat.st_ino):
+            try:
+                tmp_path = dest + ".tmp"
+                os.link(src, tmp_path)
+                os.replace(tmp_path, dest)
+                action = "linked"
+            except OSError:
+                if os.path.lexists(tmp_path):
+                    os.remove(tmp_path)
+    else:
+        if os.path.lexists(dest):
+            os.remove(dest)
+        action = "copied"
+        if LINK_CARDS:
+            try:
+                os.link(src, dest)
+                action = "linked"
+            except OSError:
+                try:
+                    reflink(src, dest)
+                    action = "linked"
+                except OSError:
+                    pass
+        if action == "copied":
+            shutil.copy2(src, dest)
+
+    with _PUBLISH_LOCK:
+        PUBLISH_STATS[action] += 1
+        PUBLISH_STATS[f'{action}_bytes'] += src_stat.st_size
+    return action
+
+def print_publish_stats():
+    if not any(PUBLISH_STATS[action] for action in ("copied", "linked", "skipped")):
+        return
+    summary = ", ".join(f"{PUBLISH_STATS[action]} {action} ({PUBLISH_STATS[f'{action}_bytes'] / 1024 / 1024:.2f} MB)"
+                        for action in ("copied", "linked", "skipped"))
+    print(f"   Cards published: {summary}")
+
+# ============================================
+# INCREMENTAL BUILD
+# ============================================
+
+def text_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def template_hash(template):
+    segments, slots = template
+    return text_hash(json.dumps([segments, slots]))
+
+def page_key(template_digest, player_data, description, links):
+    """Manifest entry for one page: (template, row, description, card links) hashes"""
+    row = json.dumps(sorted((str(k), str(v)) for k, v in player_data.items()))
+    return [template_digest, text_hash(row), text_hash(description), text_hash(json.dumps(links))]
+
+def manifest_path(output_folder):
+    return os.path.join(os.path.dirname(os.path.abspath(output_folder)), PAGES_MANIFEST)
+
+def remove_player_files(username, output_folder):
+    """Delete a departed player's page and published cards; returns files removed"""
+    paths = [os.path.join(output_folder, f"{username}.html")]
+    paths += [os.path.join(output_folder, "cards", f"{username}_{kind}{ext}")
+              for kind in ("card",) + DERIVATIVE_KINDS for ext in CARD_EXTENSIONS]
+    removed = 0
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+            removed += 1
+    return removed
+
 # ============================================
 # HELPER FUNCTIONS
 # ============================================
@@ -50,16 +274,36 @@ def generate_badges_html(badges_str, archetype):
         if archetype not in badges_list:
             badges_list.append(archetype)
     
-    html = ""
+    badges_html = ""
     for badge in badges_list:
         # Using a sleek css-based badge instead of emoji
-        badge_class = badge.lower().replace(" ", "-")
-        html += f'<div class="badge-item badge-{badge_class}" title="{badge}">{badge}</div>\n                '
+        badge_class = html.escape(badge.lower().replace(" ", "-"))
+        badge = html.escape(badge)
+        badges_html += f'<div class="badge-item badge-{badge_class}" title="{badge}">{badge}</div>\n                '
     
-    return html
+    return badges_html
+
+def find_card(folder, username, kind="card"):
+    """Newest card (or derivative) file for a player in any produced format, or None"""
+    candidates = [os.path.join(folder, f"{username}_{kind}{ext}") for ext in CARD_EXTENSIONS]
+    existing = [path for path in candidates if os.path.exists(path)]
+    if not existing:
+        return None
+    return os.path.basename(max(existing, key=os.path.getmtime))
 
-def generate_html_page(player_data, template_html, cards_folder, output_folder, base_url):
-    """Generate personalized HTML page for one player"""
+def generate_html_page(player_data, template, cards_folder, output_folder, base_url,
+                       manifest=None, template_digest=None, writer=None, force=False):
+    """
+    Generate personalized HTML page for one player
+
+    With a manifest, the page is only rendered if its page_key changed (or
+    the file is missing) or force is set, and the manifest entry is updated. With a
+    write_pool.WritePool, card publishing and the page write are queued on it
+    and their failures are reported by writer.close(), tagged with the username.
+
+    Returns:
+        Path of the page, or None if it was already up to date
+    """
     
     username = str(player_data['Username'])
     archetype = str(player_data['Archetype'])
@@ -71,63 +315,155 @@ def generate_html_page(player_data, template_html, cards_folder, output_folder,
     
     description = ARCHETYPE_DESCRIPTIONS.get(archetype, "You have a unique approach to operative challenges!")
     
-    card_filename = f"{username}_card.png"
-    card_url = f"./cards/{card_filename}"
+    # Copy card image and its derivatives to output folder
+    cards_output_dir = os.path.join(output_folder, "cards")
+    card_files = {}
+    for kind in ("card",) + DERIVATIVE_KINDS:
+        filename = find_card(cards_folder, username, kind)
+        if filename:
+            os.makedirs(cards_output_dir, exist_ok=True)
+            src, dest = os.path.join(cards_folder, filename), os.path.join(cards_output_dir, filename)
+            if writer is None:
+                publish_file(src, dest)
+            else:
+                writer.submit(dest, publish_file, src, dest, tag=username)
+        else:
+            # Try searching in wrapped_pages/cards if localized
+            filename = find_card(cards_output_dir, username, kind)
+        card_files[kind] = filename
+
+    card_filename = card_files['card']
+    if not card_filename:
+        print(f"  ⚠️  Warning: Card not found for {username}")
+    card_url = f"./cards/{card_filename}" if card_filename else ""
+    card_ext = os.path.splitext(card_filename)[1] if card_filename else ".png"
+    # Social previews use the 1200x630 share image (falling back to the card);
+    # scrapers need an absolute og:image URL
+    share_file = card_files['share'] or card_filename
+    share_url = f"{base_url}/cards/{share_file}" if share_file else ""
     
-    # Copy card image to output folder
-    card_src = os.path.join(cards_folder, card_filename)
-    if os.path.exists(card_src):
-        cards_output_dir = os.path.join(output_folder, "cards")
-        os.makedirs(cards_output_dir, exist_ok=True)
-        card_dest = os.path.join(cards_output_dir, card_filename)
-        shutil.copy2(card_src, card_dest)
-    else:
-        # Try searching in wrapped_pages/cards if localized
-        alt_card_src = os.path.join(output_folder, "cards", card_filename)
-        if not os.path.exists(alt_card_src):
-            print(f"  ⚠️  Warning: Card not found for {username}")
-            card_url = ""
+    page_url = f"{base_url}/{username}.html"
+    output_path = os.path.join(output_folder, f"{username}.html")
+    if manifest is not None:
+        key = page_key(template_digest, player_data, description, [card_files, page_url])
+        if not force and manifest.get(username) == key and os.path.exists(output_path):
+            return None
     
     badges_html = generate_badges_html(player_data.get('Badges', ''), archetype)
-    page_url = f"{base_url}/{username}.html"
     
-    html = template_html
     replacements = {
-        '{{USERNAME}}': username,
-        '{{ARCHETYPE}}': archetype,
-        '{{ARCHETYPE_DESCRIPTION}}': description,
-        '{{CARD_URL}}': card_url,
-        '{{SOLVED}}': solved,
-        '{{TOTAL}}': total,
-        '{{RANK}}': rank,
-        '{{TIME}}': time_display,
-        '{{CATEGORY}}': category,
-        '{{BADGES_HTML}}': badges_html,
-        '{{PAGE_URL}}': page_url
+        'USERNAME': username,
+        'ARCHETYPE': archetype,
+        'ARCHETYPE_DESCRIPTION': description,
+        'CARD_URL': card_url,
+        'CARD_EXT': card_ext,
+        'SHARE_URL': share_url,
+        'SOLVED': solved,
+        'TOTAL': total,
+        'RANK': rank,
+        'TIME': time_display,
+        'CATEGORY': category,
+        'BADGES_HTML': badges_html,
+        'PAGE_URL': page_url
     }
+    values = {name: value if name in RAW_PLACEHOLDERS else html.escape(value)
+              for name, value in replacements.items()}
     
-    for placeholder, value in replacements.items():
-        html = html.replace(placeholder, value)
-    
-    output_path = os.path.join(output_folder, f"{username}.html")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html)
+    page = render_template(template, values)
+    if writer is None:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(page)
+    else:
+        writer.write(output_path, page, tag=username)
+    if manifest is not None:
+        manifest[username] = key
     
     return output_path
 
-def main():
+def generate_pages(players, template, cards_folder=CARDS_FOLDER, output_folder=OUTPUT_FOLDER, base_url=BASE_URL,
+                   force=False):
+    """
+    Generate the pages whose inputs changed and remove departed players' pages
+
+    Args:
+        players: player_data.csv rows as dicts of strings
+        template: Template from load_template / compile_template
+        force: Rewrite every page, even if its manifest entry is current
+
+    Returns:
+        Number of pages generated
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    print(f"\n🎨 Generating personalized pages...")
+    print("-" * 60)
+
+    path = manifest_path(output_folder)
+    # Loaded even with force: it is the record of which players have published pages
+    manifest = write_pool.load_manifest(path)
+    template_digest = template_hash(template)
+    writer = write_pool.WritePool(IO_THREADS)
+    
+    generated_count = 0
+    unchanged_count = 0
+    for player_data in players:
+        try:
+            output_path = generate_html_page(
+                player_data, 
+                template, 
+                cards_folder, 
+                output_folder,
+                base_url,
+                manifest,
+                template_digest,
+                writer,
+                force
+            )
+            if output_path is None:
+                unchanged_count += 1
+                continue
+            generated_count += 1
+            if generated_count % 20 == 0:
+                print(f"  ...Generated {generated_count} pages")
+        except Exception as e:
+            manifest.pop(str(player_data.get('Username')), None)
+            print(f"  ❌ Error generating page for {player_data.get('Username', 'Unknown')}: {e}")
+
+    # Queued writes that failed: retried on the next run
+    write_failures = writer.close()
+    for username, failed_path, error in write_failures:
+        manifest.pop(username, None)
+        print(f"  ❌ Error writing {failed_path}: {error}")
+    generated_count -= sum(1 for _, failed_path, _ in write_failures if failed_path.endswith(".html"))
+
+    # Players who disappeared from player_data.csv
+    current = {str(player_data['Username']) for player_data in players}
+    removed_count = 0
+    for username in sorted(set(manifest) - current):
+        remove_player_files(username, output_folder)
+        del manifest[username]
+        removed_count += 1
+    write_pool.save_manifest(path, manifest)
+    
+    print("-" * 60)
+    print(f"\n✅ COMPLETE!")
+    print(f"   Successfully generated: {generated_count} pages")
+    print(f"   Unchanged: {unchanged_count} pages")
+    if removed_count:
+        print(f"   Removed: {removed_count} pages of departed players")
+    if write_failures:
+        print(f"   Failed writes: {len(write_failures)} files")
+    print_publish_stats()
+    return generated_count
+
+def main(force=False):
     print("=" * 60)
     print("CTF WRAPPED HTML GENERATOR (PROFESSIONAL)")
     print("=" * 60)
     
     os.makedirs(OUTPUT_FOLDER, exist_ok=True)
     
-    try:
-        with open(HTML_TEMPLATE, 'r', encoding='utf-8') as f:
-            template_html = f.read()
-        print("  ✓ Template loaded")
-    except FileNotFoundError:
-        print(f"  ❌ Error: Template file '{HTML_TEMPLATE}' not found!")
+    template = load_template(HTML_TEMPLATE)
+    if template is None:
         return
     
     print(f"\n📊 Reading player data from {CSV_FILE}...")
@@ -142,28 +478,14 @@ def main():
         print(f"  ❌ Error: File '{CSV_FILE}' not found!")
         return
     
-    print(f"\n🎨 Generating personalized pages...")
-    print("-" * 60)
-    
-    generated_count = 0
-    for player_data in players:
-        try:
-            generate_html_page(
-                player_data, 
-                template_html, 
-                CARDS_FOLDER, 
-                OUTPUT_FOLDER,
-                BASE_URL
-            )
-            generated_count += 1
-            if generated_count % 20 == 0:
-                print(f"  ...Generated {generated_count} pages")
-        except Exception as e:
-            print(f"  ❌ Error generating page for {player_data.get('Username', 'Unknown')}: {e}")
-    
-    print("-" * 60)
-    print(f"\n✅ COMPLETE!")
-    print(f"   Successfully generated: {generated_count} pages")
+    generate_pages(players, template, CARDS_FOLDER, OUTPUT_FOLDER, BASE_URL, force)
     
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Generate personalized wrapped pages from player_data.csv")
+    parser.add_argument("--force", action="store_true",
+                        help="rewrite every page, ignoring the pages manifest")
+    parser.add_argument("--io-threads", type=int, default=IO_THREADS,
+                        help="threads writing pages and cards (0 = write synchronously)")
+    args = parser.parse_args()
+    IO_THREADS = args.io_threads
+    main(force=args.force)
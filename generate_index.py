@@ -10,29 +10,36 @@ import os
 # Get paths
 base_path = os.path.dirname(os.path.abspath(__file__))
 csv_path = os.path.join(base_path, "player_data.csv")
+output_dir = os.path.join(base_path, "wrapped_pages")
+
+# Thumbnail formats personalize_cards_v2.py can produce
+THUMB_EXTENSIONS = (".png", ".webp", ".avif")
+
+def find_thumb(username, cards_dir):
+    """Thumbnail path relative to the index page (newest format wins), or empty"""
+    candidates = [f"{username}_thumb{ext}" for ext in THUMB_EXTENSIONS]
+    existing = [name for name in candidates if os.path.exists(os.path.join(cards_dir, name))]
+    if not existing:
+        return ""
+    return "cards/" + max(existing, key=lambda name: os.path.getmtime(os.path.join(cards_dir, name)))
 
-# Read player data
-players_data = []
-try:
-    with open(csv_path, mode='r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            players_data.append({
-                "username": row['Username'],
-                "archetype": row['Archetype'],
-                "solved": row['Total_Solved'],
-                "rank": row['Rank'],
-                "time": row['Time_Display']
-            })
-except FileNotFoundError:
-    print(f"❌ Error: {csv_path} not found")
-    exit(1)
-
-# Generate JavaScript code
-js_data = json.dumps(players_data, indent=8)
-
-# HTML template
-html = f'''<!DOCTYPE html>
+def index_entries(rows, cards_dir):
+    """Index records for player_data.csv rows (dicts of strings)"""
+    return [{
+        "username": row['Username'],
+        "archetype": row['Archetype'],
+        "solved": row['Total_Solved'],
+        "rank": row['Rank'],
+        "time": row['Time_Display'],
+        "thumb": find_thumb(row['Username'], cards_dir)
+    } for row in rows]
+
+def build_index_html(players_data):
+    # Generate JavaScript code
+    js_data = json.dumps(players_data, indent=8)
+
+    # HTML template
+    return f'''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -64,6 +71,13 @@ html = f'''<!DOCTYPE html>
             transform: translateY(-5px);
             box-shadow: 0 10px 30px rgba(0,0,0,0.5);
         }}
+        .player-thumb {{
+            width: 100%;
+            aspect-ratio: 3 / 2;
+            object-fit: cover;
+            object-position: top;
+            border: 1px solid var(--border);
+        }}
         .player-name {{
             font-family: var(--font-display);
             font-size: 2rem;
@@ -172,6 +186,7 @@ html = f'''<!DOCTYPE html>
 
             playerGrid.innerHTML = filteredPlayers.map(player => `
                 <a href="${{player.username}}.html" class="player-card">
+                    ${{player.thumb ? `<img class="player-thumb" src="${{player.thumb}}" alt="" loading="lazy" width="300" height="533">` : ''}}
                     <div class="player-name">${{player.username}}</div>
                     <div class="player-archetype">${{player.archetype}}</div>
                     <div class="player-stats">
@@ -215,13 +230,33 @@ html = f'''<!DOCTYPE html>
 </body>
 </html>'''
 
-# Write to file
-output_dir = os.path.join(base_path, "wrapped_pages")
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
+def write_index(rows, output_dir=output_dir):
+    """
+    Write wrapped_pages/index.html for a list of players
+
+    Returns:
+        Path of the written index
+    """
+    players_data = index_entries(rows, os.path.join(output_dir, "cards"))
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    output_path = os.path.join(output_dir, "index.html")
+    with open(output_path, "w") as f:
+        f.write(build_index_html(players_data))
+    return output_path
+
+def main():
+    # Read player data
+    try:
+        with open(csv_path, mode='r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+    except FileNotFoundError:
+        print(f"❌ Error: {csv_path} not found")
+        exit(1)
 
-output_path = os.path.join(output_dir, "index.html")
-with open(output_path, "w") as f:
-    f.write(html)
+    output_path = write_index(rows)
+    print(f"✅ Professional Index generated at {output_path}")
 
-print(f"✅ Professional Index generated at {{output_path}}")
+if __name__ == "__main__":
+    main()
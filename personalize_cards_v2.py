@@ -5,10 +5,19 @@ Generates Spotify-style wrap cards with 100% pixel-perfect code-only design.
 Fixes all alignment, spacing, and overlap issues.
 """
 
+import argparse
+import contextlib
 import csv
+import hashlib
+import io
+import json
 import os
 import random
-from PIL import Image, ImageDraw, ImageFont
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from PIL import Image, ImageDraw, ImageFont, features
+
+import write_pool
 
 # ============================================
 # CONFIGURATION
@@ -18,6 +27,37 @@ BASE_PATH = os.path.dirname(os.path.abspath(__file__))
 CSV_FILE = os.path.join(BASE_PATH, "player_data.csv")
 OUTPUT_FOLDER = os.path.join(BASE_PATH, "personalized_cards")
 
+# Card encoding: "png", "webp" or "avif" (WebP/AVIF need Pillow built with them)
+CARD_FORMAT = "png"
+PNG_COMPRESS_LEVEL = 6      # zlib effort 0-9 (6 is Pillow's default)
+CARD_PALETTE_COLORS = 0     # >0 quantises cards to an adaptive palette of this many colours
+CARD_PALETTE_METHOD = Image.Quantize.FASTOCTREE  # MEDIANCUT is ~6x slower for a marginally closer palette
+CARD_QUALITY = 90           # WebP/AVIF quality; 100 = lossless WebP
+
+# Format -> (Pillow encoder, file extension)
+CARD_FORMATS = {
+    "png": ("PNG", ".png"),
+    "webp": ("WEBP", ".webp"),
+    "avif": ("AVIF", ".avif"),
+}
+
+# Derivatives written next to each card from the same render
+SHARE_SIZE = (1200, 630)    # og:image for social previews
+SHARE_FORMAT = "png"        # always: most link-preview scrapers reject WebP/AVIF og:images
+THUMB_WIDTH = 300           # index thumbnail, height keeps the card's aspect ratio
+
+# Players handed to a worker process at a time with --workers
+CARD_CHUNK_SIZE = 25
+# Threads writing encoded cards, per process (0 = write synchronously)
+IO_THREADS = write_pool.WRITE_THREADS
+
+# Input-field hashes of the cards on disk; unchanged players are skipped
+CARD_MANIFEST = os.path.join(OUTPUT_FOLDER, ".card_manifest.json")
+# Bump whenever the card design changes so every card is re-rendered
+RENDERER_VERSION = "5.1"
+# player_data.csv columns that appear on the card
+CARD_FIELDS = ['Username', 'Archetype', 'Total_Solved', 'Total_Available', 'Rank', 'Time_Display', 'Fav_Category']
+
 # Dimensions (Spotify Card Aspect Ratio)
 WIDTH, HEIGHT = 800, 1422 
 CENTER_X = WIDTH // 2
@@ -27,6 +67,36 @@ FONT_PATH = "/System/Library/Fonts/Supplemental/Arial.ttf"
 if not os.path.exists(FONT_PATH):
     FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
 
+# Display font for name, archetype and metric values (falls back to FONT_PATH)
+DISPLAY_FONT_PATH = "/System/Library/Fonts/Supplemental/Impact.ttf"
+
+# Render mode: "procedural" draws the V5 dossier card, "template" composites
+# card_bg.png and the archetype chibi (see create_placeholders.py)
+RENDER_MODE = "procedural"
+TEMPLATE_BG = os.path.join(BASE_PATH, "card_bg.png")
+CHIBI_FOLDER = os.path.join(BASE_PATH, "chibis")
+
+# Chibi mapping
+CHIBI_MAP = {
+    "The Hopeless Romantic": "chibi_hopeless_romantic.png",
+    "The Player": "chibi_player.png",
+    "The Committed One": "chibi_committed_one.png",
+    "The Heartbreaker": "chibi_heartbreaker.png",
+    "The Overthinker": "chibi_overthinker.png",
+    "The Chaotic Lover": "chibi_chaotic_lover.png",
+    "The Slow Burn": "chibi_slow_burn.png"
+}
+
+# Template text positions (adjust to match your card_bg.png)
+TITLE_POSITION = (540, 280)
+TITLE_FONT_SIZE = 68
+CHIBI_POSITION = (540, 600)
+CHIBI_SIZE = (400, 400)
+STATS_START_Y = 950
+STATS_LINE_HEIGHT = 60
+STATS_X = 150
+STATS_FONT_SIZE = 40
+
 # Colors from Infra/Cybercom Theme
 BG_COLOR = (5, 5, 5)        # Deep Black
 ACCENT_COLOR = (255, 107, 53) # Cyber Orange
@@ -39,13 +109,55 @@ BORDER_COLOR = (50, 50, 50)
 # PRECISION TOOLS
 # ============================================
 
+# Loaded FreeTypeFont objects per (path, size); None marks a font that failed to load
+_FONT_CACHE = {}
+
+def load_font(path, size):
+    """Memoized ImageFont.truetype - each (path, size) is parsed from disk once"""
+    key = (path, size)
+    if key not in _FONT_CACHE:
+        try:
+            _FONT_CACHE[key] = ImageFont.truetype(path, size)
+        except Exception:
+            _FONT_CACHE[key] = None
+    return _FONT_CACHE[key]
+
 def get_font(size):
-    try:
-        return ImageFont.truetype(FONT_PATH, size)
-    except:
-        return ImageFont.load_default()
+    font = load_font(FONT_PATH, size)
+    if font is None:
+        font = _FONT_CACHE.setdefault(("default", 0), ImageFont.load_default())
+    return font
 
-def draw_technical_viz(draw, rect):
+def get_display_font(size, fallback_size):
+    """Display font at size, or the body font at fallback_size if it's unavailable"""
+    font = load_font(DISPLAY_FONT_PATH, size)
+    return font if font is not None else get_font(fallback_size)
+
+def preload_fonts():
+    """
+    Resolve and load every font the card layout uses, logging fallbacks once
+
+    Returns:
+        Dict describing which font files are in use
+    """
+    for size in (14, 18, 22, 24, 28, 32, 34, 40, 42, 68, 75, 105):
+        get_font(size)
+    for size in (42, 82, 110):
+        load_font(DISPLAY_FONT_PATH, size)
+
+    body = FONT_PATH if load_font(FONT_PATH, 18) is not None else "PIL default bitmap font"
+    display = DISPLAY_FONT_PATH if load_font(DISPLAY_FONT_PATH, 42) is not None else body
+    if body != FONT_PATH:
+        print(f"  ⚠️  Font {FONT_PATH} unavailable - using {body}")
+    if display != DISPLAY_FONT_PATH:
+        print(f"  ⚠️  Display font {DISPLAY_FONT_PATH} unavailable - using {display}")
+    return {'body': body, 'display': display}
+
+def player_rng(player_data):
+    """Random generator seeded from the username, so a player's card is reproducible"""
+    return random.Random(str(player_data['Username']))
+
+def draw_technical_viz(draw, rect, rng):
     """Draws a centered, balanced technical visualization"""
     rx, ry, rw, rh = rect
     draw.rectangle([rx, ry, rx+rw, ry+rh], outline=(40, 40, 40), width=1)
@@ -61,7 +173,7 @@ def draw_technical_viz(draw, rect):
         # Background bar
         draw.rectangle([rx + bar_margin, curr_y, rx + bar_margin + avail_w, curr_y + 12], fill=(25, 25, 25))
         # Foreground bar (Data)
-        data_w = random.randint(30, avail_w)
+        data_w = rng.randint(30, avail_w)
         draw.rectangle([rx + bar_margin, curr_y, rx + bar_margin + data_w, curr_y + 12], fill=ACCENT_COLOR)
         curr_y += 35
 
@@ -74,47 +186,337 @@ def draw_technical_viz(draw, rect):
     draw.line([(rx+rw+5, ry+rh+5), (rx+rw+5-acc, ry+rh+5)], fill=ACCENT_COLOR, width=2)
     draw.line([(rx+rw+5, ry+rh+5), (rx+rw+5, ry+rh+5-acc)], fill=ACCENT_COLOR, width=2)
 
-def personalize_card(player_data):
-    username = str(player_data['Username']).upper()
-    archetype = str(player_data['Archetype']).upper()
-    solved = str(player_data['Total_Solved'])
-    total = str(player_data.get('Total_Available', '22'))
-    rank = str(player_data['Rank'])
-    time_display = str(player_data['Time_Display'])
-    category = str(player_data.get('Fav_Category', 'Generalist')).upper()
+# ============================================
+# LAYOUT CACHE
+# ============================================
+
+# Scratch surface for measuring text before a card canvas exists
+_MEASURE = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+
+# textbbox at the origin per (text, font); fonts are memoized, so identity is stable
+_TEXT_BOX_CACHE = {}
+# layout_metric_value result per value text
+_METRIC_LAYOUT_CACHE = {}
+# Cache lookups in this process (worker counts are merged in by render_parallel)
+LAYOUT_STATS = {'box_hits': 0, 'box_misses': 0, 'layout_hits': 0, 'layout_misses': 0}
+
+def text_bbox(text, font):
+    """Memoized draw.textbbox((0, 0), text, font=font)"""
+    key = (text, font)
+    box = _TEXT_BOX_CACHE.get(key)
+    if box is None:
+        box = _TEXT_BOX_CACHE[key] = _MEASURE.textbbox((0, 0), text, font=font)
+        LAYOUT_STATS['box_misses'] += 1
+    else:
+        LAYOUT_STATS['box_hits'] += 1
+    return box
+
+def text_box_at(xy, text, font):
+    """draw.textbbox(xy, ...) for left-anchored text, from the cached origin box"""
+    left, top, right, bottom = text_bbox(text, font)
+    return (left + xy[0], top + xy[1], right + xy[0], bottom + xy[1])
+
+def print_layout_stats():
+    for name, label in (('box', "text boxes"), ('layout', "metric layouts")):
+        hits, misses = LAYOUT_STATS[f'{name}_hits'], LAYOUT_STATS[f'{name}_misses']
+        if hits + misses:
+            print(f"📐 Layout cache ({label}): {hits / (hits + misses):.1%} hit rate "
+                  f"({hits} hits, {misses} misses)")
+
+# ============================================
+# STATIC LAYER
+# ============================================
+
+# Frame inset and left edge of the dossier text column
+FRAME_MARGIN = 45
+TABLE_MARGIN = 100
+
+FOOTER_Y = HEIGHT - FRAME_MARGIN - 45
+TAGLINE = "CYBER_COMMAND_PROPERTY_2026"
+
+# Pre-rendered backgrounds keyed by whether the footer tagline is baked in
+_STATIC_LAYERS = {}
+# Ink box of the baked tagline (None if it can't be baked safely)
+_TAGLINE_BOX = None
+
+def boxes_overlap(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+def draw_tagline(draw):
+    footer_f = get_font(18)
+    t_bbox = text_bbox(TAGLINE, footer_f)
+    draw.text((WIDTH - FRAME_MARGIN - 20 - (t_bbox[2]-t_bbox[0]), FOOTER_Y), TAGLINE, font=footer_f, fill=(60, 60, 60))
+
+def tagline_box():
+    """Ink box of the footer tagline on the card"""
+    footer_f = get_font(18)
+    t_bbox = text_bbox(TAGLINE, footer_f)
+    return text_box_at((WIDTH - FRAME_MARGIN - 20 - (t_bbox[2]-t_bbox[0]), FOOTER_Y), TAGLINE, font=footer_f)
+
+def serial_box():
+    """Widest ink box any serial number can occupy"""
+    footer_f = get_font(18)
+    digit = max("0123456789", key=lambda d: _MEASURE.textlength(d, font=footer_f))
+    left, top, right, bottom = _MEASURE.textbbox((FRAME_MARGIN + 20, FOOTER_Y), f"SERIAL: {digit * 6}-{digit * 2}", font=footer_f)
+    return (left, top, right + 4, bottom)
+
+def render_static_layer(with_tagline):
+    """
+    Draw the parts of the card that never change between players
+
+    Grid, frame and header come first in the card's draw order. The tagline
+    is drawn last, so it's only baked in when the per-player text can't
+    touch it (see personalize_card).
+
+    Args:
+        with_tagline: Include the footer tagline
 
-    # 1. Base Canvas
+    Returns:
+        RGB image to copy each card from
+    """
     card = Image.new('RGB', (WIDTH, HEIGHT), color=BG_COLOR)
     draw = ImageDraw.Draw(card)
-    
-    # 2. Tech Grid
+
+    # Tech Grid
     grid_step = 60
     for x in range(0, WIDTH, grid_step):
         draw.line([(x, 0), (x, HEIGHT)], fill=GRID_COLOR, width=1)
     for y in range(0, HEIGHT, grid_step):
         draw.line([(0, y), (WIDTH, y)], fill=GRID_COLOR, width=1)
 
-    # 3. Outer Frame
-    margin = 45
+    # Outer Frame
+    margin = FRAME_MARGIN
     draw.rectangle([margin, margin, WIDTH-margin, HEIGHT-margin], outline=BORDER_COLOR, width=2)
-    
-    # 4. Header Labels
+
+    # Header Labels
     label_font = get_font(18)
     draw.text((margin + 20, margin + 20), "INTEL_REPORT_V5.0", font=label_font, fill=DIM_WHITE)
-    
+
     status_text = "ACCESS: ENCRYPTED"
-    s_bbox = draw.textbbox((0, 0), status_text, font=label_font)
+    s_bbox = text_bbox(status_text, label_font)
     draw.text((WIDTH - margin - 20 - (s_bbox[2]-s_bbox[0]), margin + 20), status_text, font=label_font, fill=ACCENT_COLOR)
 
+    if with_tagline:
+        draw_tagline(draw)
+    return card
+
+def get_static_layer(with_tagline=True):
+    """Memoized render_static_layer - each variant is drawn once per process"""
+    global _TAGLINE_BOX
+    if not _STATIC_LAYERS:
+        _TAGLINE_BOX = tagline_box()
+        # The serial is drawn before the tagline; never bake it if they could touch
+        if boxes_overlap(_TAGLINE_BOX, serial_box()):
+            _TAGLINE_BOX = None
+    with_tagline = with_tagline and _TAGLINE_BOX is not None
+    if with_tagline not in _STATIC_LAYERS:
+        _STATIC_LAYERS[with_tagline] = render_static_layer(with_tagline)
+    return _STATIC_LAYERS[with_tagline]
+
+def layout_metric_value(value):
+    """Memoized compute_metric_layout - repeated values cost a dict lookup"""
+    layout = _METRIC_LAYOUT_CACHE.get(value)
+    if layout is None:
+        layout = _METRIC_LAYOUT_CACHE[value] = compute_metric_layout(value)
+        LAYOUT_STATS['layout_misses'] += 1
+    else:
+        LAYOUT_STATS['layout_hits'] += 1
+    return layout
+
+def compute_metric_layout(value):
+    """
+    Pick the font and line placement for a right-aligned metric value
+
+    Long hyphenated names (e.g. CORE_SPECIALTY) are split across lines in a
+    smaller font; other long values are scaled down.
+
+    Args:
+        value: Upper-cased value text
+
+    Returns:
+        (font, ((text, x, y offset from the row top), ...))
+    """
+    v_font = get_display_font(42, 42)
+
+    # Handle long text with splitting (e.g., CORE_SPECIALTY)
+    max_chars = 18
+    if len(value) > max_chars and "-" in value:
+        # Try to split on hyphen for technical names
+        parts = value.split("-")
+        # Reconstruct lines
+        lines = []
+        curr_line = ""
+        for p in parts:
+            if len(curr_line) + len(p) < max_chars:
+                curr_line += (p + "-" if p != parts[-1] else p)
+            else:
+                lines.append(curr_line)
+                curr_line = p + "-" if p != parts[-1] else p
+        if curr_line: lines.append(curr_line)
+
+        # Smaller font for multi-line
+        v_font = get_font(32)
+
+        placements = []
+        v_y = 5
+        for line in lines:
+            l_bbox = text_bbox(line, v_font)
+            l_width = l_bbox[2] - l_bbox[0]
+            placements.append((line, WIDTH - TABLE_MARGIN - l_width, v_y))
+            v_y += 35
+        return v_font, tuple(placements)
+
+    # Standard single-line logic with scaling
+    if len(value) > 20:
+        v_font = get_font(28)
+    elif len(value) > 15:
+        v_font = get_font(34)
+
+    v_bbox = text_bbox(value, v_font)
+    value_x = WIDTH - TABLE_MARGIN - (v_bbox[2]-v_bbox[0])
+    return v_font, ((value, value_x, 10),)
+
+# ============================================
+# TEMPLATE COMPOSITING
+# ============================================
+
+# Decoded card_bg.png and chibis, loaded once per process (inherited by forked workers)
+_TEMPLATE_ASSETS = None
+
+def get_template_assets():
+    """
+    Decode the template background and archetype chibis once
+
+    Chibis are resized to CHIBI_SIZE and converted to premultiplied RGBa up
+    front, so compositing one is a single paste with no per-card decode,
+    resample or alpha conversion. The images are only ever read afterwards.
+
+    Returns:
+        {'background': RGB image, 'chibis': {archetype: RGBa image}}
+    """
+    global _TEMPLATE_ASSETS
+    if _TEMPLATE_ASSETS is None:
+        with Image.open(TEMPLATE_BG) as bg:
+            background = bg.convert('RGB')
+        chibis = {}
+        for archetype, filename in CHIBI_MAP.items():
+            chibi_path = os.path.join(CHIBI_FOLDER, filename)
+            try:
+                with Image.open(chibi_path) as chibi:
+                    chibi = chibi.convert('RGBA')
+            except FileNotFoundError:
+                print(f"  ⚠️  Chibi not found: {chibi_path}")
+                continue
+            if chibi.size != CHIBI_SIZE:
+                chibi = chibi.resize(CHIBI_SIZE, Image.Resampling.LANCZOS)
+            chibis[archetype] = chibi.convert('RGBa')
+        _TEMPLATE_ASSETS = {'background': background, 'chibis': chibis}
+    return _TEMPLATE_ASSETS
+
+def template_signature():
+    """Size and mtime of the template art, so replacing it re-renders every card"""
+    stamps = []
+    for path in [TEMPLATE_BG] + [os.path.join(CHIBI_FOLDER, name) for name in sorted(CHIBI_MAP.values())]:
+        try:
+            stat = os.stat(path)
+            stamps.append(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}")
+        except OSError:
+            stamps.append(f"{os.path.basename(path)}:missing")
+    return hashlib.sha256("|".join(stamps).encode('utf-8')).hexdigest()[:16]
+
+def render_template_card(player_data):
+    """
+    Composite one player's card from card_bg.png and their archetype chibi
+
+    Returns:
+        RGB card image (card_bg.png's size)
+    """
+    archetype = str(player_data['Archetype'])
+    solved = str(player_data['Total_Solved'])
+    total = str(player_data.get('Total_Available', '22'))
+    rank = str(player_data['Rank'])
+    time_display = str(player_data['Time_Display'])
+    category = str(player_data.get('Fav_Category', 'Generalist'))
+
+    assets = get_template_assets()
+    card = assets['background'].copy()
+
+    # Premultiplied RGBa as its own mask: out = chibi + card * (1 - alpha)
+    chibi = assets['chibis'].get(archetype)
+    if chibi is not None:
+        chibi_x = CHIBI_POSITION[0] - CHIBI_SIZE[0] // 2
+        chibi_y = CHIBI_POSITION[1] - CHIBI_SIZE[1] // 2
+        card.paste(chibi, (chibi_x, chibi_y), chibi)
+
+    draw = ImageDraw.Draw(card)
+    title_font = get_font(TITLE_FONT_SIZE)
+    stats_font = get_font(STATS_FONT_SIZE)
+
+    title = archetype.upper()
+    t_bbox = text_bbox(title, title_font)
+    draw.text((TITLE_POSITION[0] - (t_bbox[2]-t_bbox[0]) // 2, TITLE_POSITION[1] - (t_bbox[3]-t_bbox[1]) // 2),
+              title, font=title_font, fill=WHITE)
+
+    stats_y = STATS_START_Y + STATS_LINE_HEIGHT + 20
+    for line in (f"► SOLVED: {solved}/{total}", f"► RANK: #{rank}",
+                 f"► TIME: {time_display}", f"► FAVORITE: {category}"):
+        draw.text((STATS_X, stats_y), line, font=stats_font, fill=WHITE)
+        stats_y += STATS_LINE_HEIGHT
+
+    return card
+
+# ============================================
+# CARD RENDERING
+# ============================================
+
+def render_card(player_data):
+    """
+    Draw one player's card in memory with the configured RENDER_MODE
+
+    Returns:
+        RGB card image
+    """
+    if RENDER_MODE == "template":
+        return render_template_card(player_data)
+    return render_procedural_card(player_data)
+
+def render_procedural_card(player_data):
+    """The code-only V5 dossier card"""
+    username = str(player_data['Username']).upper()
+    archetype = str(player_data['Archetype']).upper()
+    solved = str(player_data['Total_Solved'])
+    total = str(player_data.get('Total_Available', '22'))
+    rank = str(player_data['Rank'])
+    time_display = str(player_data['Time_Display'])
+    category = str(player_data.get('Fav_Category', 'Generalist')).upper()
+    rng = player_rng(player_data)
+
     # Layout Constants
-    table_margin = 100
+    table_margin = TABLE_MARGIN
+    table_y = 1000
+    row_height = 85
+
+    metrics = [
+        ("TARGETS_RESOLVED", f"{solved} / {total}"),
+        ("FIELD_PERCENTILE", f"RANK_{rank}"),
+        ("MISSION_DURATION", time_display),
+        ("CORE_SPECIALTY", category)
+    ]
+    metric_layouts = [layout_metric_value(value) for _, value in metrics]
+
+    # 1-4. Grid, frame and header come pre-rendered. The tagline is drawn
+    # after the metric values, so it's only pre-rendered if no value reaches it.
+    get_static_layer()
+    bake_tagline = _TAGLINE_BOX is not None and not any(
+        boxes_overlap(_TAGLINE_BOX, text_box_at((x, table_y + i * row_height + dy), text, v_font))
+        for i, (v_font, placements) in enumerate(metric_layouts)
+        for text, x, dy in placements
+    )
+    card = get_static_layer(bake_tagline).copy()
+    draw = ImageDraw.Draw(card)
 
     # 5. Operative Name Block (DOSSIER STYLING)
-    try:
-        user_font_path = "/System/Library/Fonts/Supplemental/Impact.ttf"
-        name_font = ImageFont.truetype(user_font_path, 110)
-    except:
-        name_font = get_font(105)
+    name_font = get_display_font(110, 105)
     
     # Switch to Left Alignment for technical dossier feel
     draw.text((table_margin, 170), username, font=name_font, fill=WHITE)
@@ -124,48 +526,27 @@ def personalize_card(player_data):
     draw.text((table_margin, 305), c_text, font=context_font, fill=ACCENT_COLOR)
 
     # 6. Archetype Display (UPGRADED STYLING)
-    try:
-        title_font_path = "/System/Library/Fonts/Supplemental/Impact.ttf"
-        arch_font = ImageFont.truetype(title_font_path, 82)
-    except:
-        arch_font = get_font(75)
+    arch_font = get_display_font(82, 75)
 
     # Change to Left Alignment with custom spacing
     draw.text((table_margin, 400), archetype, font=arch_font, fill=WHITE)
     
     # Decorative line under the archetype - with increased gap
-    a_bbox = draw.textbbox((table_margin, 400), archetype, font=arch_font)
+    a_bbox = text_box_at((table_margin, 400), archetype, arch_font)
     draw.line([(table_margin, a_bbox[3] + 15), (table_margin + 70, a_bbox[3] + 15)], fill=ACCENT_COLOR, width=4)
 
     # 7. Viz Section (Repositioned for spacing)
     viz_y = 580
-    draw_technical_viz(draw, (180, viz_y, 440, 320))
+    draw_technical_viz(draw, (180, viz_y, 440, 320), rng)
 
     # 8. Precise Metric Table (MASTER ALIGNMENT)
-    table_y = 1000
-    row_height = 85
-    
     section_font = get_font(22)
     draw.text((table_margin, table_y - 50), "► OPERATIONAL_METRICS", font=section_font, fill=ACCENT_COLOR)
     
-    metrics = [
-        ("TARGETS_RESOLVED", f"{solved} / {total}"),
-        ("FIELD_PERCENTILE", f"RANK_{rank}"),
-        ("MISSION_DURATION", time_display),
-        ("CORE_SPECIALTY", category)
-    ]
-    
     label_f = get_font(18) # Slightly smaller for more professional look
     
-    # Try using Impact for values to maintain design consistency
-    try:
-        impact_path = "/System/Library/Fonts/Supplemental/Impact.ttf"
-        value_font_base = ImageFont.truetype(impact_path, 42)
-    except:
-        value_font_base = get_font(42)
-    
     curr_y = table_y
-    for label, value in metrics:
+    for (label, _), (v_font, placements) in zip(metrics, metric_layouts):
         # Divider
         draw.line([(table_margin, curr_y + 75), (WIDTH - table_margin, curr_y + 75)], fill=(40, 40, 40), width=1)
         
@@ -173,82 +554,398 @@ def personalize_card(player_data):
         draw.text((table_margin, curr_y + 25), label, font=label_f, fill=DIM_WHITE)
         
         # Value (Right) - Intelligent Wrapping & Alignment
-        v_font = value_font_base
-        
-        # Handle long text with splitting (e.g., CORE_SPECIALTY)
-        max_chars = 18
-        if len(value) > max_chars and "-" in value:
-            # Try to split on hyphen for technical names
-            parts = value.split("-")
-            # Reconstruct lines
-            lines = []
-            curr_line = ""
-            for p in parts:
-                if len(curr_line) + len(p) < max_chars:
-                    curr_line += (p + "-" if p != parts[-1] else p)
-                else:
-                    lines.append(curr_line)
-                    curr_line = p + "-" if p != parts[-1] else p
-            if curr_line: lines.append(curr_line)
-            
-            # Smaller font for multi-line
-            v_font = ImageFont.truetype(impact_path, 32) if "Impact" in str(v_font) else get_font(32)
-            
-            # Draw each line
-            v_y = curr_y + 5
-            for line in lines:
-                l_bbox = draw.textbbox((0, 0), line, font=v_font)
-                l_width = l_bbox[2] - l_bbox[0]
-                draw.text((WIDTH - table_margin - l_width, v_y), line, font=v_font, fill=WHITE)
-                v_y += 35
-        else:
-            # Standard single-line logic with scaling
-            if len(value) > 20: 
-                v_font = ImageFont.truetype(impact_path, 28) if "Impact" in str(v_font) else get_font(28)
-            elif len(value) > 15:
-                v_font = ImageFont.truetype(impact_path, 34) if "Impact" in str(v_font) else get_font(34)
-                
-            v_bbox = draw.textbbox((0, 0), value, font=v_font)
-            value_x = WIDTH - table_margin - (v_bbox[2]-v_bbox[0])
-            value_y = curr_y + 10 
-            draw.text((value_x, value_y), value, font=v_font, fill=WHITE)
+        for text, x, dy in placements:
+            draw.text((x, curr_y + dy), text, font=v_font, fill=WHITE)
         
         curr_y += row_height
 
     # 9. Master Footer
+    margin = FRAME_MARGIN
     footer_f = get_font(18)
-    serial = f"SERIAL: {random.randint(100000, 999999)}-{random.randint(10, 99)}"
-    draw.text((margin + 20, HEIGHT - margin - 45), serial, font=footer_f, fill=(60, 60, 60))
+    serial = f"SERIAL: {rng.randint(100000, 999999)}-{rng.randint(10, 99)}"
+    draw.text((margin + 20, FOOTER_Y), serial, font=footer_f, fill=(60, 60, 60))
     
-    tagline = "CYBER_COMMAND_PROPERTY_2026"
-    t_bbox = draw.textbbox((0, 0), tagline, font=footer_f)
-    draw.text((WIDTH - margin - 20 - (t_bbox[2]-t_bbox[0]), HEIGHT - margin - 45), tagline, font=footer_f, fill=(60, 60, 60))
+    if not bake_tagline:
+        draw_tagline(draw)
+
+    return card
+
+def personalize_card(player_data, writer=None):
+    """
+    Render a player's card and write it, plus its derivatives, to OUTPUT_FOLDER
 
-    # Save
-    output_path = os.path.join(OUTPUT_FOLDER, f"{player_data['Username']}_card.png")
-    card.save(output_path, "PNG")
+    With a write_pool.WritePool the encoded files are queued on it (tagged
+    with the username) instead of being written before this returns.
+    """
+    card = render_card(player_data)
+    output_path = card_path(player_data)
+    encode_card(card, output_path, writer, player_data.get('Username'))
+    save_derivatives(card, player_data, writer)
     return output_path
 
-def main():
+def render_card_bytes(player_data, fmt=None):
+    """
+    Render a player's card straight to encoded bytes, without touching disk
+
+    Args:
+        player_data: player_data.csv row
+        fmt: Key of CARD_FORMATS (default CARD_FORMAT)
+
+    Returns:
+        Encoded card file contents
+    """
+    buffer = io.BytesIO()
+    encode_image(render_card(player_data), buffer, fmt)
+    return buffer.getvalue()
+
+# ============================================
+# ENCODING
+# ============================================
+
+# Totals for the cards encoded by this process
+ENCODE_STATS = {'cards': 0, 'seconds': 0.0, 'bytes': 0}
+
+def resolve_card_format(fmt):
+    """Return fmt if this Pillow build can write it, otherwise fall back to PNG"""
+    if fmt != "png" and not features.check(fmt):
+        print(f"  ⚠️  Pillow was built without {fmt.upper()} support - writing PNG instead")
+        return "png"
+    return fmt
+
+def encode_image(image, output, fmt=None):
+    """
+    Write an image with the configured encoder settings
+
+    Args:
+        image: RGB image
+        output: Destination path (extension from CARD_FORMATS) or binary file object
+        fmt: Key of CARD_FORMATS (default CARD_FORMAT)
+
+    Returns:
+        (encode seconds, bytes written)
+    """
+    fmt = fmt or CARD_FORMAT
+    start = time.perf_counter()
+    if CARD_PALETTE_COLORS:
+        image = image.quantize(colors=CARD_PALETTE_COLORS, method=CARD_PALETTE_METHOD)
+    pil_format, _ = CARD_FORMATS[fmt]
+    if fmt == "png":
+        options = {'compress_level': PNG_COMPRESS_LEVEL}
+    elif fmt == "webp":
+        options = {'quality': min(CARD_QUALITY, 100), 'lossless': CARD_QUALITY >= 100}
+    else:
+        options = {'quality': CARD_QUALITY}
+    if image.mode == "P" and fmt != "png":
+        image = image.convert("RGB")
+    if hasattr(output, 'write'):
+        image.save(output, pil_format, **options)
+        size = output.tell()
+    else:
+        # Replaced, never rewritten in place: the published copy may be a hardlink to it
+        write_pool.replace_file(output, lambda tmp_path: image.save(tmp_path, pil_format, **options))
+        size = os.path.getsize(output)
+    return time.perf_counter() - start, size
+
+def save_image(image, output_path, writer=None, tag=None, fmt=None):
+    """encode_image to output_path, or to memory with the bytes queued on writer"""
+    if writer is None:
+        return encode_image(image, output_path, fmt)
+    buffer = io.BytesIO()
+    result = encode_image(image, buffer, fmt)
+    writer.write(output_path, buffer.getvalue(), tag)
+    return result
+
+def encode_card(card, output_path, writer=None, tag=None):
+    """save_image for the full-size card, counted in ENCODE_STATS"""
+    seconds, size = save_image(card, output_path, writer, tag)
+    ENCODE_STATS['cards'] += 1
+    ENCODE_STATS['seconds'] += seconds
+    ENCODE_STATS['bytes'] += size
+    return seconds, size
+
+def encoder_signature():
+    return f"{CARD_FORMAT}|{PNG_COMPRESS_LEVEL}|{CARD_PALETTE_COLORS}|{CARD_QUALITY}"
+
+# ============================================
+# DERIVATIVES
+# ============================================
+
+# Share-image background grid, drawn once per process
+_SHARE_LAYER = None
+
+def get_share_layer():
+    global _SHARE_LAYER
+    if _SHARE_LAYER is None:
+        share_w, share_h = SHARE_SIZE
+        layer = Image.new('RGB', SHARE_SIZE, color=BG_COLOR)
+        draw = ImageDraw.Draw(layer)
+        for x in range(0, share_w, 60):
+            draw.line([(x, 0), (x, share_h)], fill=GRID_COLOR, width=1)
+        for y in range(0, share_h, 60):
+            draw.line([(0, y), (share_w, y)], fill=GRID_COLOR, width=1)
+        _SHARE_LAYER = layer
+    return _SHARE_LAYER
+
+def save_derivatives(card, player_data, writer=None):
+    """
+    Write the og:image share card and the index thumbnail from an in-memory card
+
+    Both are resampled from one 2x box-reduced copy, which is much cheaper
+    than two bicubic passes over the full-size card.
+    """
+    card_w, card_h = card.size
+    half = card.reduce(2)
+
+    share_w, share_h = SHARE_SIZE
+    scaled_w = round(card_w * share_h / card_h)
+    share = get_share_layer().copy()
+    share.paste(half.resize((scaled_w, share_h), Image.Resampling.BICUBIC), ((share_w - scaled_w) // 2, 0))
+    save_image(share, card_path(player_data, "share"), writer, player_data.get('Username'), SHARE_FORMAT)
+
+    thumb = half.resize((THUMB_WIDTH, round(card_h * THUMB_WIDTH / card_w)), Image.Resampling.BICUBIC)
+    save_image(thumb, card_path(player_data, "thumb"), writer, player_data.get('Username'))
+
+# ============================================
+# INCREMENTAL REBUILD
+# ============================================
+
+# Files written per player: the card and its derivatives
+CARD_KINDS = ("card", "share", "thumb")
+
+def card_path(player_data, kind="card"):
+    fmt = SHARE_FORMAT if kind == "share" else CARD_FORMAT
+    return os.path.join(OUTPUT_FOLDER, f"{player_data['Username']}_{kind}{CARD_FORMATS[fmt][1]}")
+
+def renderer_signature(fonts):
+    """Everything besides the player row that changes the card file"""
+    mode = f"template:{template_signature()}" if RENDER_MODE == "template" else RENDER_MODE
+    return f"{RENDERER_VERSION}|{mode}|{fonts['body']}|{fonts['display']}|{encoder_signature()}"
+
+def card_key(player_data, signature):
+    """Hash of the card's input fields and the renderer signature"""
+    fields = [str(player_data.get(field)) for field in CARD_FIELDS]
+    return hashlib.sha256(json.dumps([signature] + fields).encode('utf-8')).hexdigest()
+
+# ============================================
+# PARALLEL RENDERING
+# ============================================
+
+def render_players(players, writer=None):
+    """
+    Render a list of players, reporting failures instead of raising
+
+    Failed writes queued on writer are reported by writer.close(), not here.
+
+    Returns:
+        List of (username, error, encode seconds, bytes) - error is None for a rendered card
+    """
+    results = []
+    for player in players:
+        seconds, size = ENCODE_STATS['seconds'], ENCODE_STATS['bytes']
+        try:
+            personalize_card(player, writer)
+            results.append((player.get('Username'), None,
+                            ENCODE_STATS['seconds'] - seconds, ENCODE_STATS['bytes'] - size))
+        except Exception as e:
+            results.append((player.get('Username'), f"{type(e).__name__}: {e}", 0.0, 0))
+    return results
+
+def render_chunk(players):
+    """
+    Worker entry point - render_players plus this chunk's layout cache counters
+
+    Returns:
+        (render_players results, LAYOUT_STATS delta, failed writes as (username, path, error))
+    """
+    before = dict(LAYOUT_STATS)
+    writer = write_pool.WritePool(IO_THREADS)
+    results = render_players(players, writer)
+    write_failures = writer.close()
+    return results, {key: LAYOUT_STATS[key] - before[key] for key in LAYOUT_STATS}, write_failures
+
+def init_worker(settings):
+    """
+    Pool initializer - load fonts and the static layer (or template art) once per worker
+
+    settings mirrors the --format/--mode/... values the parent applied in its
+    __main__ block. Forked workers inherit the parent's decoded template assets
+    and only read them.
+    """
+    globals().update(settings)
+    # Font and chibi fallbacks were already reported by the parent
+    with contextlib.redirect_stdout(io.StringIO()):
+        preload_fonts()
+        if RENDER_MODE == "template":
+            get_template_assets()
+        else:
+            get_static_layer()
+
+def render_parallel(players, workers, write_failures):
+    """
+    Spread players across a process pool in chunks of CARD_CHUNK_SIZE
+
+    Args:
+        write_failures: List extended with the workers' failed writes
+
+    Yields:
+        (username, error, encode seconds, bytes) per player as chunks complete
+    """
+    chunks = [players[i:i + CARD_CHUNK_SIZE] for i in range(0, len(players), CARD_CHUNK_SIZE)]
+    settings = {
+        'OUTPUT_FOLDER': OUTPUT_FOLDER,
+        'CARD_FORMAT': CARD_FORMAT,
+        'PNG_COMPRESS_LEVEL': PNG_COMPRESS_LEVEL,
+        'CARD_PALETTE_COLORS': CARD_PALETTE_COLORS,
+        'CARD_QUALITY': CARD_QUALITY,
+        'RENDER_MODE': RENDER_MODE,
+        'TEMPLATE_BG': TEMPLATE_BG,
+        'CHIBI_FOLDER': CHIBI_FOLDER,
+        'IO_THREADS': IO_THREADS,
+    }
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(settings,)) as pool:
+        futures = {pool.submit(render_chunk, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            try:
+                results, layout_stats, failures = future.result()
+            except Exception as e:
+                # The worker itself died - report the whole chunk
+                for player in futures[future]:
+                    yield player.get('Username'), f"{type(e).__name__}: {e}", 0.0, 0
+                continue
+            for key, count in layout_stats.items():
+                LAYOUT_STATS[key] += count
+            write_failures.extend(failures)
+            yield from results
+
+def render_cards(players, workers=1, force=False):
+    """
+    Render (or skip, if unchanged) the cards for a list of player records
+
+    Args:
+        players: player_data.csv rows as dicts of strings
+        workers: Worker processes (0 = every CPU core)
+        force: Ignore the card manifest and re-render everything
+
+    Returns:
+        List of (username, error) for cards that failed, or None if the
+        renderer could not start
+    """
+    global CARD_FORMAT
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+    CARD_FORMAT = resolve_card_format(CARD_FORMAT)
+    fonts = preload_fonts()
+    print(f"🔤 Fonts: {os.path.basename(fonts['body'])} / {os.path.basename(fonts['display'])}")
+    if RENDER_MODE == "template":
+        if not os.path.exists(TEMPLATE_BG):
+            print(f"\n❌ ERROR: Template not found: {TEMPLATE_BG}")
+            return None
+        # Decoded before the pool starts so forked workers share it
+        assets = get_template_assets()
+        print(f"🖼️  Template: {os.path.basename(TEMPLATE_BG)} + {len(assets['chibis'])} chibis")
+    
+    # Only players whose card inputs (or the renderer) changed get drawn
+    signature = renderer_signature(fonts)
+    manifest = write_pool.load_manifest(CARD_MANIFEST)
+    keys = {player['Username']: card_key(player, signature) for player in players}
+    todo = [player for player in players
+            if force or manifest.get(player['Username']) != keys[player['Username']]
+            or not all(os.path.exists(card_path(player, kind)) for kind in CARD_KINDS)]
+    skipped = len(players) - len(todo)
+    if skipped:
+        print(f"♻️  {skipped} cards unchanged since the last run - skipping")
+
+    workers = min(workers or os.cpu_count() or 1, max(len(todo), 1))
+    start = time.perf_counter()
+    writer = None
+    write_failures = []
+    if not todo:
+        results = []
+    elif workers > 1:
+        print(f"🚀 Generating {len(todo)} pixel-perfect reports with {workers} workers...")
+        results = render_parallel(todo, workers, write_failures)
+    else:
+        print(f"🚀 Generating {len(todo)} pixel-perfect reports...")
+        writer = write_pool.WritePool(IO_THREADS)
+        results = (result for player in todo for result in render_players([player], writer))
+
+    failed = []
+    encode_seconds = 0.0
+    encode_bytes = 0
+    for i, (username, error, seconds, size) in enumerate(results):
+        encode_seconds += seconds
+        encode_bytes += size
+        if error is not None:
+            failed.append((username, error))
+            manifest.pop(username, None)
+            print(f"  ❌ {username}: {error}")
+        else:
+            manifest[username] = keys[username]
+        if (i+1) % 20 == 0: print(f"  ...Produced {i+1} cards")
+    if writer is not None:
+        write_failures.extend(writer.close())
+    # A player with any unwritten file is re-rendered next run
+    failed_users = {username for username, _ in failed}
+    for username, failed_path, error in write_failures:
+        print(f"  ❌ {username}: writing {os.path.basename(failed_path)} failed: {error}")
+        if username not in failed_users:
+            failed_users.add(username)
+            failed.append((username, error))
+            manifest.pop(username, None)
+    elapsed = time.perf_counter() - start
+
+    write_pool.save_manifest(CARD_MANIFEST, {username: key for username, key in manifest.items() if username in keys})
+            
+    print("-" * 60)
+    encoded = len(todo) - len(failed)
+    if encoded:
+        palette = f", {CARD_PALETTE_COLORS}-colour palette" if CARD_PALETTE_COLORS else ""
+        level = f" level {PNG_COMPRESS_LEVEL}" if CARD_FORMAT == "png" else f" quality {CARD_QUALITY}"
+        print(f"📦 {CARD_FORMAT.upper()}{level}{palette}: "
+              f"{encode_seconds / encoded * 1000:.1f} ms and {encode_bytes / encoded / 1024:.1f} KB per card "
+              f"({encode_bytes / 1024 / 1024:.2f} MB total)")
+    print_layout_stats()
+    if failed:
+        print(f"⚠️  {len(todo) - len(failed)}/{len(todo)} cards rendered, {len(failed)} failed ({elapsed:.2f}s)")
+    else:
+        print(f"✅ FINALIZED: Optimization Complete. ({len(todo)} rendered, {skipped} unchanged in {elapsed:.2f}s)")
+    return failed
+
+def main(workers=1, force=False):
     print("=" * 60)
     print("CTF WRAPPED CARD GENERATOR - V5 MASTER PRECISION")
     print("=" * 60)
     
-    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
-    
     players = []
     with open(CSV_FILE, mode='r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         for row in reader:
             players.append(row)
     
-    print(f"🚀 Generating {len(players)} pixel-perfect reports...")
-    for i, player in enumerate(players):
-        personalize_card(player)
-        if (i+1) % 20 == 0: print(f"  ...Produced {i+1} cards")
-            
-    print("-" * 60)
-    print(f"✅ FINALIZED: Optimization Complete.")
+    render_cards(players, workers, force)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Render personalized wrapped cards from player_data.csv")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="render across N worker processes (0 = every CPU core)")
+    parser.add_argument("--mode", choices=["procedural", "template"], default=RENDER_MODE,
+                        help="draw the code-only card or composite card_bg.png and chibis")
+    parser.add_argument("--force", action="store_true",
+                        help="re-render every card, ignoring the card manifest")
+    parser.add_argument("--format", choices=sorted(CARD_FORMATS), default=CARD_FORMAT,
+                        help="card image format")
+    parser.add_argument("--compress-level", type=int, choices=range(10), default=PNG_COMPRESS_LEVEL,
+                        metavar="0-9", help="PNG zlib compression level")
+    parser.add_argument("--palette", type=int, default=CARD_PALETTE_COLORS, metavar="COLORS",
+                        help="quantise cards to an adaptive palette of this many colours (0 = off)")
+    parser.add_argument("--quality", type=int, default=CARD_QUALITY,
+                        help="WebP/AVIF quality (100 = lossless WebP)")
+    parser.add_argument("--io-threads", type=int, default=IO_THREADS,
+                        help="threads writing encoded cards per process (0 = write synchronously)")
+    args = parser.parse_args()
+    RENDER_MODE = args.mode
+    CARD_FORMAT = args.format
+    PNG_COMPRESS_LEVEL = args.compress_level
+    CARD_PALETTE_COLORS = args.palette
+    CARD_QUALITY = args.quality
+    IO_THREADS = args.io_threads
+    main(workers=args.workers, force=args.force)
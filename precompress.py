@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+CTF Wrapped Precompressor
+Writes .gz and .br siblings next to the text assets in wrapped_pages so static
+servers and CDNs can send precompressed bytes instead of compressing per request.
+"""
+
+import argparse
+import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import write_pool
+
+try:
+    import brotli
+except ImportError:  # pip install brotli - without it only .gz siblings are written
+    brotli = None
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+SITE_FOLDER = os.path.join(BASE_PATH, "wrapped_pages")
+
+# Text assets worth compressing; images are already compressed
+COMPRESS_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg", ".txt", ".xml")
+# npm tooling kept in the site folder but not part of the served site
+# (dot-folders are skipped too)
+SKIP_DIRS = {"node_modules"}
+SKIP_FILES = {"package.json", "package-lock.json"}
+# Below this the headers outweigh the savings
+MIN_COMPRESS_BYTES = 256
+
+GZIP_LEVEL = 9              # 1-9
+BROTLI_QUALITY = 11         # 0-11
+
+# Largest files listed in the size report
+TOP_OFFENDERS = 10
+
+# Sibling suffix per encoding
+ENCODINGS = {"gzip": ".gz", "br": ".br"}
+
+# Files whose compressed form would not be smaller, with the source mtime that
+# was checked; kept beside (not inside) the site folder so it is not deployed
+INCOMPRESSIBLE_MANIFEST = ".precompress_incompressible.json"
+
+# ============================================
+# COMPRESSION
+# ============================================
+
+def available_encodings():
+    return [encoding for encoding in ENCODINGS if encoding != "br" or brotli is not None]
+
+def compress_bytes(data, encoding, gzip_level=GZIP_LEVEL, brotli_quality=BROTLI_QUALITY):
+    if encoding == "gzip":
+        # mtime=0 keeps the output reproducible across builds
+        return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+    return brotli.compress(data, quality=brotli_quality, mode=brotli.MODE_TEXT)
+
+def sibling_path(path, encoding):
+    return path + ENCODINGS[encoding]
+
+def incompressible_path(folder):
+    return os.path.join(os.path.dirname(os.path.abspath(folder)), INCOMPRESSIBLE_MANIFEST)
+
+def sibling_is_current(path, encoding, source_stat, incompressible=None):
+    """
+    A sibling is current when it carries its source's mtime (set by
+    compress_file), or when this version of the source was already found
+    not worth compressing
+    """
+    if incompressible and incompressible.get(encoding) == source_stat.st_mtime_ns:
+        return True
+    try:
+        return os.stat(sibling_path(path, encoding)).st_mtime_ns == source_stat.st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+def compress_file(path, encodings, gzip_level=GZIP_LEVEL, brotli_quality=BROTLI_QUALITY):
+    """
+    Write one file's compressed siblings
+
+    Each sibling is written to a temporary file, renamed into place and given
+    the source's mtime. A sibling that would not be smaller is removed instead.
+
+    Returns:
+        (path, {encoding: sibling bytes or None if not worth keeping})
+    """
+    source_stat = os.stat(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    sizes = {}
+    for encoding in encodings:
+        compressed = compress_bytes(data, encoding, gzip_level, brotli_quality)
+        target = sibling_path(path, encoding)
+        if len(compressed) >= len(data):
+            if os.path.exists(target):
+                os.remove(target)
+            sizes[encoding] = None
+            continue
+        tmp_path = target + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.utime(tmp_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        os.replace(tmp_path, target)
+        sizes[encoding] = len(compressed)
+    return path, sizes
+
+def walk_site(folder):
+    """os.walk over the served site, pruning SKIP_DIRS, SKIP_FILES and dot-folders"""
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and not d.startswith("."))
+        yield root, [name for name in files if name not in SKIP_FILES]
+
+def site_files(folder):
+    """Text assets under folder that get compressed siblings"""
+    for root, files in walk_site(folder):
+        for name in sorted(files):
+            if name.endswith(COMPRESS_EXTENSIONS):
+                path = os.path.join(root, name)
+                if os.path.getsize(path) >= MIN_COMPRESS_BYTES:
+                    yield path
+
+def remove_orphans(folder):
+    """Delete .gz/.br siblings whose source file is gone; returns how many"""
+    removed = 0
+    suffixes = tuple(ENCODINGS.values())
+    for root, files in walk_site(folder):
+        for name in files:
+            if not name.endswith(suffixes):
+                continue
+            source = os.path.splitext(name)[0]
+            if source.endswith(COMPRESS_EXTENSIONS) and source not in files:
+                os.remove(os.path.join(root, name))
+                removed += 1
+    return removed
+
+# ============================================
+# SITE PASS
+# ============================================
+
+def precompress_site(folder=SITE_FOLDER, workers=0, gzip_level=GZIP_LEVEL, brotli_quality=BROTLI_QUALITY,
+                     force=False):
+    """
+    Write the missing or outdated compressed siblings for a static site folder
+
+    Args:
+        folder: Site root (wrapped_pages)
+        workers: Compression processes (0 = every CPU core)
+        force: Recompress files whose siblings look current (e.g. after changing a level)
+
+    Returns:
+        List of (path, original bytes, {encoding: sibling bytes or None}) for
+        every text asset, or None if folder does not exist
+    """
+    if not os.path.isdir(folder):
+        print(f"  ❌ Error: Site folder '{folder}' not found!")
+        return None
+    encodings = available_encodings()
+    if brotli is None:
+        print("  ⚠️  brotli is not installed - writing .gz siblings only (pip install brotli)")
+
+    files = list(site_files(folder))
+    sources = {path: os.stat(path) for path in files}
+    manifest_path = incompressible_path(folder)
+    incompressible = write_pool.load_manifest(manifest_path)
+    names = {path: os.path.relpath(path, folder) for path in files}
+    todo = [path for path in files
+            if force or not all(sibling_is_current(path, encoding, sources[path], incompressible.get(names[path]))
+                                for encoding in encodings)]
+    print(f"🗜️  {len(todo)} of {len(files)} text assets to compress "
+          f"({', '.join(encodings)}; gzip level {gzip_level}, brotli quality {brotli_quality})")
+
+    sizes = {}
+    failed = []
+    workers = min(workers or os.cpu_count() or 1, max(len(todo), 1))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(compress_file, path, encodings, gzip_level, brotli_quality): path
+                       for path in todo}
+            for future in as_completed(futures):
+                try:
+                    path, file_sizes = future.result()
+                    sizes[path] = file_sizes
+                except Exception as e:
+                    failed.append((futures[future], f"{type(e).__name__}: {e}"))
+    else:
+        for path in todo:
+            try:
+                sizes[path] = compress_file(path, encodings, gzip_level, brotli_quality)[1]
+            except Exception as e:
+                failed.append((path, f"{type(e).__name__}: {e}"))
+    for path, error in failed:
+        print(f"  ❌ {os.path.relpath(path, folder)}: {error}")
+
+    for path, file_sizes in sizes.items():
+        skipped = {encoding: sources[path].st_mtime_ns for encoding, size in file_sizes.items() if size is None}
+        if skipped:
+            incompressible[names[path]] = skipped
+        else:
+            incompressible.pop(names[path], None)
+    write_pool.save_manifest(manifest_path, {name: entry for name, entry in incompressible.items()
+                                             if name in names.values()})
+
+    # Up-to-date siblings are reported from disk
+    report = []
+    for path in files:
+        if path not in sizes:
+            sizes[path] = {}
+            for encoding in encodings:
+                sibling = sibling_path(path, encoding)
+                sizes[path][encoding] = os.path.getsize(sibling) if os.path.exists(sibling) else None
+        report.append((path, sources[path].st_size, sizes[path]))
+
+    removed = remove_orphans(folder)
+    if removed:
+        print(f"  🧹 Removed {removed} siblings of deleted files")
+    print_size_report(report, encodings, folder)
+    return report
+
+def print_size_report(report, encodings, folder):
+    """Totals per encoding and the TOP_OFFENDERS largest files as served"""
+    if not report:
+        return
+    original = sum(size for _, size, _ in report)
+    print("-" * 60)
+    print(f"📊 {len(report)} files, {original / 1024:.1f} KB uncompressed")
+    for encoding in encodings:
+        # Files without a sibling are served as-is
+        total = sum(sizes.get(encoding) or size for _, size, sizes in report)
+        print(f"   {encoding:5s} {total / 1024:10.1f} KB ({total / original:.1%})")
+
+    def served(entry):
+        _, size, sizes = entry
+        return min([size] + [sizes[encoding] for encoding in encodings if sizes.get(encoding)])
+
+    print(f"\n   Top {min(TOP_OFFENDERS, len(report))} by compressed size:")
+    for entry in sorted(report, key=served, reverse=True)[:TOP_OFFENDERS]:
+        path, size, sizes = entry
+        columns = "  ".join(f"{encoding} {(sizes.get(encoding) or size) / 1024:7.1f} KB" for encoding in encodings)
+        print(f"   {os.path.relpath(path, folder):32s} {size / 1024:8.1f} KB  →  {columns}")
+
+def main(folder=SITE_FOLDER, workers=0, gzip_level=GZIP_LEVEL, brotli_quality=BROTLI_QUALITY, force=False):
+    print("=" * 60)
+    print("CTF WRAPPED PRECOMPRESSOR")
+    print("=" * 60)
+    precompress_site(folder, workers, gzip_level, brotli_quality, force)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write .gz/.br siblings for the text assets of wrapped_pages")
+    parser.add_argument("folder", nargs="?", default=SITE_FOLDER, help="static site folder")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="compression processes (0 = every CPU core)")
+    parser.add_argument("--gzip-level", type=int, choices=range(1, 10), default=GZIP_LEVEL, metavar="1-9")
+    parser.add_argument("--brotli-quality", type=int, choices=range(12), default=BROTLI_QUALITY, metavar="0-11")
+    parser.add_argument("--force", action="store_true",
+                        help="recompress even where the siblings are up to date")
+    args = parser.parse_args()
+    main(args.folder, args.workers, args.gzip_level, args.brotli_quality, args.force)
@@ -4,9 +4,28 @@ CTF Data Processor - Transform team-based CTF data to individual player data
 Converts your CSV exports into player_data.csv format needed for Wrapped
 """
 
+import argparse
+import contextlib
+import hashlib
+import io
+import os
+import pickle
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
 import pandas as pd
 from collections import defaultdict
 
+import write_pool
+
+# Feather snapshots need pyarrow; fall back to pickle when it isn't installed
+try:
+    import pyarrow  # noqa: F401
+    SNAPSHOT_FORMAT = "feather"
+except ImportError:
+    SNAPSHOT_FORMAT = "pickle"
+
 # ============================================
 # CONFIGURATION
 # ============================================
@@ -16,9 +35,58 @@ USERS_CSV = "../users (1).csv"
 SUBMISSIONS_CSV = "../submissions (1).csv"
 SCOREBOARD_CSV = "../scoreboard (1).csv"
 
+# Optional challenge metadata (Challenge, Category, Points) for real favorite
+# categories; without it Fav_Category falls back to the first challenge touched
+CHALLENGES_CSV = "../challenges.csv"
+
 # Output file
 OUTPUT_CSV = "../player_data.csv"
 
+# Batch mode: file names expected inside each event directory of the manifest
+EVENT_USERS_CSV = "users.csv"
+EVENT_SUBMISSIONS_CSV = "submissions.csv"
+EVENT_SCOREBOARD_CSV = "scoreboard.csv"
+EVENT_CHALLENGES_CSV = "challenges.csv"
+EVENT_OUTPUT_CSV = "player_data.csv"
+EVENT_LOG = "process_ctf_data.log"
+
+# Streaming mode: read submissions in chunks of this many rows (None = load whole file)
+SUBMISSIONS_CHUNK_SIZE = None
+
+# Parsed snapshots of the CSV exports, keyed by file size + hash (None = disabled)
+PARSE_CACHE_DIR = "../.ctf_cache"
+
+# Incremental refresh: per-player aggregate state + Timestamp watermark
+REFRESH_STATE_FILE = "../.ctf_refresh_state.pkl"
+REFRESH_CHUNK_SIZE = 100_000
+REFRESH_STATE_VERSION = 4
+
+# Rank shown on cards/pages: "team" (team scoreboard rank, N/A without one),
+# "individual" (rank by total Points Awarded) or "team_or_individual"
+# (team rank, falling back to the individual rank)
+RANK_MODE = "team"
+
+# Pacing-aware archetypes: a default "Chaotic Lover" with at least 3 solves whose
+# solve gaps shrank by this factor (first half vs second half) is a "Slow Burn"
+PACING_ARCHETYPES = False
+SLOW_BURN_ACCELERATION = 2.0
+
+# Favorite category basis: "attempted" (most submissions) or "solved" (most
+# unique solves, falling back to attempts for players who solved nothing)
+FAV_CATEGORY_BASIS = "attempted"
+
+# Submission timestamps: explicit strftime format ("ISO8601" covers the platform
+# export) and the timezone naive timestamps are in (None = keep them naive)
+TIMESTAMP_FORMAT = "ISO8601"
+TIMESTAMP_TZ = None
+
+# Columns of the submissions export used by the aggregation
+SUBMISSION_COLUMNS = ['Username', 'Challenge', 'Correct', 'Points Awarded', 'Timestamp']
+# Key columns are always read as text: a chunk (or export) where every username
+# or challenge name looks like a number would otherwise come back as ints
+SUBMISSION_DTYPES = {'Username': str, 'Challenge': str, 'Correct': str}
+USER_DTYPES = {'Username': str}
+
 # ============================================
 # ARCHETYPE LOGIC (Simplified for ASAP launch)
 # ============================================
@@ -61,147 +129,873 @@ def calculate_archetype(stats):
     else:
         return "The Chaotic Lover"  # Default
 
+def calculate_archetypes(completion_percent, total_solved, correct_submissions, incorrect_submissions,
+                         solve_acceleration=None):
+    """
+    Vectorized calculate_archetype() for whole columns of players
+
+    Args:
+        completion_percent: Array of completion percentages
+        total_solved: Array of unique challenges solved
+        correct_submissions: Array of correct submission counts
+        incorrect_submissions: Array of incorrect submission counts
+        solve_acceleration: Optional array from compute_solve_timeline(); when
+            given, clearly accelerating default players become "The Slow Burn"
+
+    Returns:
+        Array of archetype names, identical to calling calculate_archetype()
+        per player when solve_acceleration is None
+    """
+    completion = np.asarray(completion_percent, dtype=float)
+    solved = np.asarray(total_solved)
+    correct = np.asarray(correct_submissions, dtype=float)
+    incorrect = np.asarray(incorrect_submissions, dtype=float)
+
+    # Same 999 sentinel as calculate_archetype for players who never solved anything
+    with np.errstate(divide='ignore', invalid='ignore'):
+        attempts_ratio = np.where(correct > 0, incorrect / correct, 999)
+
+    conditions = [
+        completion == 100,
+        completion >= 80,
+        completion >= 50,
+        (solved >= 5) & (attempts_ratio < 2),
+        (solved >= 3) & (attempts_ratio > 5),
+        (solved >= 1) & (completion < 30),
+    ]
+    choices = [
+        "The Committed One",
+        "The Hopeless Romantic",
+        "The Slow Burn",
+        "The Player",
+        "The Overthinker",
+        "The Heartbreaker",
+    ]
+    archetypes = np.select(conditions, choices, default="The Chaotic Lover")
+
+    if solve_acceleration is not None:
+        acceleration = np.asarray(solve_acceleration, dtype=float)
+        with np.errstate(invalid='ignore'):
+            speeding_up = (solved >= 3) & (acceleration >= SLOW_BURN_ACCELERATION)
+        archetypes = np.where((archetypes == "The Chaotic Lover") & speeding_up, "The Slow Burn", archetypes)
+
+    return archetypes
+
+def calculate_badges(completion_percent, total_solved, span_seconds):
+    """
+    Badge strings for whole columns of players
+
+    perfect_score: 100% completion
+    speed_demon: solved something with under 2 hours between first and last submission
+
+    Returns:
+        Array of comma-separated badge strings ("" for no badges)
+    """
+    perfect = np.asarray(completion_percent, dtype=float) == 100
+    with np.errstate(invalid='ignore'):
+        speed = (np.asarray(total_solved) > 0) & (np.asarray(span_seconds, dtype=float) < 7200)
+
+    return np.select(
+        [perfect & speed, perfect, speed],
+        ["perfect_score,speed_demon", "perfect_score", "speed_demon"],
+        default="",
+    )
+
+# Timestamp parsing totals for the run summary
+PARSE_STATS = {'rows': 0, 'seconds': 0.0, 'failed': 0}
+
 # ============================================
-# MAIN PROCESSING
+# PARSE CACHE
+# ============================================
+
+def parse_timestamps(values):
+    """
+    Parse a whole Timestamp column once into int64 epoch nanoseconds
+
+    Uses TIMESTAMP_FORMAT instead of per-value format inference and reads naive
+    timestamps as TIMESTAMP_TZ wall-clock time. Unparseable values become <NA>
+    and are counted in PARSE_STATS['failed'].
+
+    Args:
+        values: Series of timestamp strings
+
+    Returns:
+        int64 Series (nullable Int64 if any value failed to parse)
+
+    Raises:
+        ValueError: No non-empty value matched TIMESTAMP_FORMAT
+    """
+    start = time.perf_counter()
+
+    parsed = pd.to_datetime(values, format=TIMESTAMP_FORMAT, errors='coerce')
+    if parsed.dt.tz is None and TIMESTAMP_TZ:
+        parsed = parsed.dt.tz_localize(TIMESTAMP_TZ, ambiguous='NaT', nonexistent='NaT')
+    if parsed.dt.tz is not None:
+        parsed = parsed.dt.tz_convert('UTC').dt.tz_localize(None)
+    parsed = parsed.dt.as_unit('ns')
+
+    missing = parsed.isna()
+    failed = int((missing & values.notna()).sum())
+    if failed and failed == int(values.notna().sum()):
+        raise ValueError(f"no Timestamp matched format {TIMESTAMP_FORMAT!r} "
+                         f"(first value: {values.dropna().iloc[0]!r}) - check --timestamp-format")
+    epoch = pd.Series(parsed.to_numpy().view('int64'), index=parsed.index)
+    if missing.any():
+        epoch = epoch.astype('Int64').mask(missing)
+
+    PARSE_STATS['rows'] += len(values)
+    PARSE_STATS['failed'] += failed
+    PARSE_STATS['seconds'] += time.perf_counter() - start
+    return epoch
+
+def read_csv_cached(path, parse_dates=(), cache_dir=PARSE_CACHE_DIR, dtype=None):
+    """
+    Read a CSV export, reusing a parsed binary snapshot when the file is unchanged
+
+    Args:
+        path: CSV file path
+        parse_dates: Columns to convert with parse_timestamps() before caching
+        cache_dir: Snapshot folder, or None to always parse the CSV
+        dtype: Column dtypes passed to pd.read_csv
+
+    Returns:
+        DataFrame
+    """
+    if not cache_dir:
+        df = pd.read_csv(path, dtype=dtype)
+        for column in parse_dates:
+            df[column] = parse_timestamps(df[column])
+        return df
+
+    stem = os.path.basename(path)
+    key = f"{os.path.getsize(path)}-{write_pool.file_digest(path)[:32]}"
+    if parse_dates or dtype:
+        # Snapshots hold parsed columns, so the parse settings are part of the key
+        settings = repr((list(parse_dates), TIMESTAMP_FORMAT, TIMESTAMP_TZ, sorted(dtype or {}))).encode()
+        key += "-" + hashlib.sha256(settings).hexdigest()[:8]
+    snapshot_path = os.path.join(cache_dir, f"{stem}.{key}.{SNAPSHOT_FORMAT}")
+
+    if os.path.exists(snapshot_path):
+        try:
+            if SNAPSHOT_FORMAT == "feather":
+                df = pd.read_feather(snapshot_path)
+            else:
+                df = pd.read_pickle(snapshot_path)
+            print(f"  ⚡ {stem}: loaded cached snapshot")
+            return df
+        except Exception as e:
+            print(f"  ⚠️  Ignoring unreadable snapshot for {stem}: {e}")
+
+    df = pd.read_csv(path, dtype=dtype)
+    for column in parse_dates:
+        df[column] = parse_timestamps(df[column])
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Drop snapshots of older versions of this export
+        for name in os.listdir(cache_dir):
+            if name.startswith(f"{stem}.") and name != os.path.basename(snapshot_path):
+                os.remove(os.path.join(cache_dir, name))
+
+        tmp_path = snapshot_path + ".tmp"
+        if SNAPSHOT_FORMAT == "feather":
+            df.to_feather(tmp_path)
+        else:
+            df.to_pickle(tmp_path)
+        os.replace(tmp_path, snapshot_path)
+    except Exception as e:
+        print(f"  ⚠️  Could not cache {stem}: {e}")
+
+    return df
+
+# ============================================
+# AGGREGATION
+# ============================================
+
+def aggregate_submissions(submissions_df):
+    """
+    Aggregate all submissions per player in a single groupby pass
+
+    Args:
+        submissions_df: Submissions DataFrame with Timestamp already run
+            through parse_timestamps()
+
+    Returns:
+        DataFrame indexed by Username with total_solved, total_submissions,
+        correct_submissions, incorrect_submissions, total_points, first_sub,
+        last_sub (epoch ns) and fav_category columns
+    """
+    is_correct = submissions_df['Correct'] == 'Yes'
+    frame = pd.DataFrame({
+        'Username': submissions_df['Username'],
+        'challenge': submissions_df['Challenge'],
+        'solved_challenge': submissions_df['Challenge'].where(is_correct),
+        'correct': is_correct,
+        'incorrect': submissions_df['Correct'] == 'No',
+        'points': submissions_df['Points Awarded'].where(is_correct, 0),
+        'timestamp': submissions_df['Timestamp'],
+    })
+
+    aggregates = frame.groupby('Username', sort=False).agg(
+        total_solved=('solved_challenge', 'nunique'),
+        total_submissions=('correct', 'size'),
+        correct_submissions=('correct', 'sum'),
+        incorrect_submissions=('incorrect', 'sum'),
+        total_points=('points', 'sum'),
+        first_sub=('timestamp', 'min'),
+        last_sub=('timestamp', 'max'),
+    )
+
+    # First challenge the player touched (placeholder for favorite category).
+    # Taken positionally so a blank challenge name is kept like the old loop did.
+    first_rows = frame.drop_duplicates('Username').set_index('Username')
+    aggregates['fav_category'] = first_rows['challenge']
+
+    return aggregates
+
+def first_solves(submissions_df):
+    """
+    First correct submission per (player, challenge)
+
+    Returns:
+        DataFrame of Username, Challenge, Timestamp (epoch ns)
+    """
+    correct = submissions_df.loc[submissions_df['Correct'] == 'Yes', ['Username', 'Challenge', 'Timestamp']]
+    return correct.groupby(['Username', 'Challenge'], sort=False, as_index=False)['Timestamp'].min()
+
+def challenge_attempts(submissions_df):
+    """
+    Submission count and first attempt per (player, challenge)
+
+    Returns:
+        DataFrame of Username, Challenge, attempts, Timestamp (epoch ns)
+    """
+    return submissions_df.groupby(['Username', 'Challenge'], sort=False, as_index=False).agg(
+        attempts=('Timestamp', 'size'),
+        Timestamp=('Timestamp', 'min'),
+    )
+
+# ============================================
+# CHALLENGE CATEGORIES
+# ============================================
+
+def load_challenge_index(path):
+    """
+    Build the challenge -> (Category, Points) index from the metadata file
+
+    Returns:
+        DataFrame indexed by Challenge, or None if there is no metadata file
+    """
+    if not path or not os.path.exists(path):
+        return None
+
+    challenges_df = pd.read_csv(path)
+    missing = {'Challenge', 'Category'} - set(challenges_df.columns)
+    if missing:
+        raise ValueError(f"{path} is missing column(s): {', '.join(sorted(missing))}")
+
+    columns = [c for c in ('Category', 'Points') if c in challenges_df.columns]
+    return challenges_df.drop_duplicates('Challenge').set_index('Challenge')[columns]
+
+def compute_fav_categories(attempts, solves, challenge_index):
+    """
+    Most-attempted (or most-solved) category per player in one grouped pass
+
+    Ties go to the category the player touched first.
+
+    Args:
+        attempts: Output of challenge_attempts()
+        solves: Output of first_solves()
+        challenge_index: Output of load_challenge_index()
+
+    Returns:
+        Series of category names indexed by Username
+    """
+    def mode(per_challenge, weight):
+        joined = per_challenge.join(challenge_index['Category'], on='Challenge').dropna(subset=['Category'])
+        by_category = joined.groupby(['Username', 'Category'], sort=False, as_index=False).agg(
+            count=(weight, 'sum'),
+            first=('Timestamp', 'min'),
+        )
+        best = by_category.sort_values(['count', 'first'], ascending=[False, True], kind='stable')
+        return best.drop_duplicates('Username').set_index('Username')['Category']
+
+    fav = mode(attempts, 'attempts')
+    if FAV_CATEGORY_BASIS == "solved":
+        fav = mode(solves.assign(solves=1), 'solves').combine_first(fav)
+    return fav
+
+def finish_aggregates(aggregates, solves, attempts=None, challenge_index=None):
+    """
+    Attach the solve timeline (only read with PACING_ARCHETYPES) and, with
+    challenge metadata, real favorite categories
+
+    Players whose submissions all hit challenges missing from the metadata get
+    "General" as their category.
+    """
+    if PACING_ARCHETYPES:
+        aggregates = aggregates.join(compute_solve_timeline(solves))
+    if challenge_index is not None:
+        fav = compute_fav_categories(attempts, solves, challenge_index)
+        aggregates['fav_category'] = fav.reindex(aggregates.index).fillna("General")
+    return aggregates
+
+# ============================================
+# SOLVE TIMELINE (pacing signals)
+# ============================================
+
+def compute_solve_timeline(solves):
+    """
+    Per-player pacing signal from first-solve timestamps
+
+    Solves are sorted once by (player, time). The statistic is then a
+    segmented reduction over each player's contiguous run, so the work after
+    the sort is linear in the number of solves.
+
+    Args:
+        solves: Output of first_solves()
+
+    Returns:
+        DataFrame indexed by Username with solve_acceleration (mean gap over
+        the first half of the run divided by the second half; > 1 means the
+        player sped up)
+    """
+    solves = solves.dropna(subset=['Username', 'Timestamp'])
+    codes, users = pd.factorize(solves['Username'])
+    times = solves['Timestamp'].to_numpy(dtype='int64')
+    n = len(users)
+    if n == 0:
+        # No correct submissions yet
+        return pd.DataFrame({'solve_acceleration': []}, index=pd.Index([], name='Username'), dtype=float)
+
+    order = np.lexsort((times, codes))
+    codes, times = codes[order], times[order]
+
+    # Gaps between consecutive solves of the same player
+    same_player = codes[1:] == codes[:-1]
+    gap_codes = codes[1:][same_player]
+    gaps = (times[1:] - times[:-1])[same_player] / 1e9
+    gap_count = np.bincount(gap_codes, minlength=n)
+
+    # Acceleration: equal-sized first and second halves of each player's gaps
+    gap_starts = np.cumsum(gap_count) - gap_count
+    position = np.arange(len(gaps)) - gap_starts[gap_codes]
+    half = gap_count // 2
+    early = position < half[gap_codes]
+    late = position >= (gap_count - half)[gap_codes]
+    early_sum = np.bincount(gap_codes[early], weights=gaps[early], minlength=n)
+    late_sum = np.bincount(gap_codes[late], weights=gaps[late], minlength=n)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        acceleration = early_sum / late_sum
+    acceleration = np.where(np.isnan(acceleration), 1.0, acceleration)  # both halves instant
+    acceleration = np.where(half > 0, acceleration, np.nan)
+
+    return pd.DataFrame({'solve_acceleration': acceleration}, index=pd.Index(users, name='Username'))
+
+class SubmissionAggregator:
+    """
+    Fold submission chunks into per-player running aggregates
+
+    Memory grows with the number of players (and solved challenges per player),
+    not with the number of submissions. result() matches aggregate_submissions()
+    run on the concatenation of every chunk, and solved matches first_solves().
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.challenges = set()
+        self.totals = None
+        self.solved = None
+        self.attempts = None
+
+    def add(self, chunk):
+        """Fold one chunk of the submissions export into the running aggregates"""
+        self.rows += len(chunk)
+        self.challenges.update(chunk['Challenge'].unique())
+
+        partial = aggregate_submissions(chunk).drop(columns='total_solved')
+        solved = first_solves(chunk)
+        attempts = challenge_attempts(chunk)
+
+        if self.totals is None:
+            self.totals = partial
+            self.solved = solved
+            self.attempts = attempts
+            return
+
+        combined = pd.concat([self.totals, partial])
+        totals = combined.groupby(level=0, sort=False).agg(
+            total_submissions=('total_submissions', 'sum'),
+            correct_submissions=('correct_submissions', 'sum'),
+            incorrect_submissions=('incorrect_submissions', 'sum'),
+            total_points=('total_points', 'sum'),
+            first_sub=('first_sub', 'min'),
+            last_sub=('last_sub', 'max'),
+        )
+        # Earliest chunk wins for the first challenge touched
+        totals['fav_category'] = combined.loc[~combined.index.duplicated(), 'fav_category']
+        self.totals = totals
+        self.solved = (
+            pd.concat([self.solved, solved])
+            .groupby(['Username', 'Challenge'], sort=False, as_index=False)['Timestamp'].min()
+        )
+        self.attempts = (
+            pd.concat([self.attempts, attempts])
+            .groupby(['Username', 'Challenge'], sort=False, as_index=False)
+            .agg(attempts=('attempts', 'sum'), Timestamp=('Timestamp', 'min'))
+        )
+
+    def result(self):
+        """Return the aggregates in the same shape as aggregate_submissions()"""
+        if self.totals is None:
+            empty = pd.DataFrame(columns=SUBMISSION_COLUMNS).astype({'Timestamp': 'int64'})
+            return aggregate_submissions(empty)
+
+        solved_counts = self.solved.groupby('Username', sort=False).size()
+        aggregates = self.totals.copy()
+        aggregates.insert(0, 'total_solved', solved_counts.reindex(aggregates.index, fill_value=0))
+        return aggregates
+
+def load_submission_aggregates(path, chunk_size=None, cache_dir=PARSE_CACHE_DIR, challenge_index=None):
+    """
+    Read the submissions export and aggregate it per player
+
+    Args:
+        path: Submissions CSV path
+        chunk_size: Rows per chunk for streaming mode, or None to load the whole file
+        cache_dir: Parse cache folder for the in-memory path (streaming never caches)
+        challenge_index: Optional load_challenge_index() result for favorite categories
+
+    Returns:
+        (aggregates, total_challenges, submission_rows)
+    """
+    if not chunk_size:
+        submissions_df = read_csv_cached(path, parse_dates=['Timestamp'], cache_dir=cache_dir,
+                                         dtype=SUBMISSION_DTYPES)
+        total_challenges = len(submissions_df['Challenge'].unique())
+        attempts = challenge_attempts(submissions_df) if challenge_index is not None else None
+        aggregates = finish_aggregates(aggregate_submissions(submissions_df), first_solves(submissions_df),
+                                       attempts, challenge_index)
+        return aggregates, total_challenges, len(submissions_df)
+
+    aggregator = SubmissionAggregator()
+    for chunk in pd.read_csv(path, usecols=SUBMISSION_COLUMNS, dtype=SUBMISSION_DTYPES, chunksize=chunk_size):
+        chunk['Timestamp'] = parse_timestamps(chunk['Timestamp'])
+        aggregator.add(chunk)
+    aggregates = finish_aggregates(aggregator.result(), aggregator.solved, aggregator.attempts, challenge_index)
+    return aggregates, len(aggregator.challenges), aggregator.rows
+
+def team_rank_index(scoreboard_df):
+    """
+    Build a team -> rank lookup from the scoreboard
+
+    For duplicate team names the first scoreboard row wins; teams without a
+    rank are left out so they fall back like unranked teams.
+    """
+    ranked = scoreboard_df.dropna(subset=['Team', 'Rank']).drop_duplicates('Team')
+    return ranked.set_index('Team')['Rank'].astype(int)
+
+def compute_rank_display(merged, scoreboard_df):
+    """
+    Rank label for every player according to RANK_MODE
+
+    Args:
+        merged: Players joined with their aggregates (needs Team and total_points)
+        scoreboard_df: Team scoreboard DataFrame
+
+    Returns:
+        Series of rank strings aligned with merged
+    """
+    # A team literally called 'No Team' is treated as no team, as before
+    teams = merged['Team'].where(merged['Team'] != 'No Team')
+    team_ranks = teams.map(team_rank_index(scoreboard_df))
+
+    individual_ranks = (
+        merged['total_points'].fillna(0)
+        .rank(method='min', ascending=False)
+        .astype(int)
+    )
+
+    if RANK_MODE == "individual":
+        ranks = individual_ranks
+    elif RANK_MODE == "team_or_individual":
+        ranks = team_ranks.fillna(individual_ranks)
+    else:
+        ranks = team_ranks
+
+    return ranks.astype('Int64').astype(str).where(ranks.notna(), "N/A")
+
+def build_player_stats(players_df, aggregates, scoreboard_df, total_challenges):
+    """
+    Turn per-player aggregates into player_data.csv rows
+
+    Args:
+        players_df: Users filtered to the PLAYER role
+        aggregates: Output of aggregate_submissions()
+        scoreboard_df: Team scoreboard DataFrame
+        total_challenges: Number of challenges in the CTF
+
+    Returns:
+        player_data DataFrame, in players_df order
+    """
+    # Span between first and last submission, taken on the int64 epoch column
+    # before the join so it never goes through float epoch values
+    span_seconds = ((aggregates['last_sub'] - aggregates['first_sub']) / 1e9).astype('float64')
+    merged = players_df.join(aggregates.assign(span_seconds=span_seconds), on='Username')
+    merged = merged.reset_index(drop=True)
+
+    submitted = merged['total_submissions'].fillna(0) > 0
+    total_solved = merged['total_solved'].fillna(0).astype(int)
+    correct_submissions = merged['correct_submissions'].fillna(0).astype(int)
+    incorrect_submissions = merged['incorrect_submissions'].fillna(0).astype(int)
+    span_seconds = merged['span_seconds'].where(submitted)
+
+    # Calculate completion percentage
+    if total_challenges > 0:
+        completion_percent = total_solved / total_challenges * 100
+    else:
+        completion_percent = pd.Series(0, index=merged.index)
+
+    # Get time spent (from first to last submission)
+    hours = (span_seconds // 3600).fillna(0).astype(int).astype(str)
+    minutes = ((span_seconds % 3600) // 60).fillna(0).astype(int).astype(str)
+    time_display = (hours + "h " + minutes + "m").where(hours != "0", minutes + "m")
+
+    # Get most attempted category (favorite category)
+    # Category from challenge metadata, or the first challenge touched without it
+    fav_category = merged['fav_category'].where(submitted, "None")
+
+    # Pacing signals only refine the archetype when PACING_ARCHETYPES is on
+    acceleration = merged['solve_acceleration'] if PACING_ARCHETYPES else None
+    archetypes = calculate_archetypes(completion_percent, total_solved, correct_submissions,
+                                      incorrect_submissions, acceleration)
+
+    output_df = pd.DataFrame({
+        'Username': merged['Username'],
+        'Email': merged['Email'],
+        'Archetype': archetypes,
+        'Total_Solved': total_solved,
+        'Total_Available': total_challenges,
+        'Rank': compute_rank_display(merged, scoreboard_df),
+        'Time_Display': time_display,
+        'Fav_Category': fav_category,
+        'Badges': calculate_badges(completion_percent, total_solved, span_seconds),
+    })
+
+    if len(output_df):
+        print("\n".join(
+            f"  ✓ {username:20s} | {archetype:25s} | Solved: {solved}/{total_challenges}"
+            for username, archetype, solved in zip(output_df['Username'], archetypes, total_solved)
+        ))
+
+    return output_df
+
+def print_parse_summary():
+    """Report how long timestamp parsing took this run, and how many values failed"""
+    rows, seconds = PARSE_STATS['rows'], PARSE_STATS['seconds']
+    if rows:
+        per_million = seconds / rows * 1_000_000
+        print(f"\n⏱️  Timestamp parsing: {rows} rows in {seconds:.2f}s ({per_million:.2f}s per million rows)")
+        if PARSE_STATS['failed']:
+            print(f"  ⚠️  {PARSE_STATS['failed']} timestamps did not match {TIMESTAMP_FORMAT!r} and were ignored")
+    else:
+        print("\n⏱️  Timestamp parsing: skipped (cached snapshot or no new rows)")
+
+# ============================================
+# INCREMENTAL REFRESH (live CTF)
 # ============================================
 
-def main():
+def load_refresh_state(path):
+    """Load the pickled refresh state, or None if there is none yet"""
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"  ⚠️  Ignoring unreadable refresh state ({e}) - rebuilding from scratch")
+        return None
+
+def save_refresh_state(state, path):
+    """Atomically write the refresh state"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+def complete_length(path, block_size=1 << 16):
+    """
+    Bytes of path up to and including its last newline
+
+    A live export may end in a row the exporter is still writing; everything
+    past the last newline is left for the next refresh.
+    """
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - block_size)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b'\n')
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+class BoundedReader(io.RawIOBase):
+    """Binary file view that ends at a fixed offset, for pd.read_csv"""
+
+    def __init__(self, f, end):
+        self.f = f
+        self.end = end
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.end - self.f.tell())
+        if size <= 0:
+            return 0
+        data = self.f.read(size)
+        buffer[:len(data)] = data
+        return len(data)
+
+def read_new_submissions(path, state, chunk_size, end):
+    """
+    Yield submission chunks not yet folded into the refresh state
+
+    Only the first end bytes (see complete_length) are parsed. If the export
+    only grew since the last refresh (the bytes just before the stored offset
+    are unchanged), only the appended rows are parsed. A rewritten export is
+    scanned and filtered on the Timestamp watermark instead; rows that share the
+    watermark timestamp are de-duplicated against the ones already seen.
+    """
+    offset = state['offset']
+    tail = state['tail']
+
+    appended = False
+    if offset and end >= offset:
+        with open(path, 'rb') as f:
+            f.seek(offset - len(tail))
+            appended = f.read(len(tail)) == tail
+
+    if appended:
+        if end == offset:
+            return
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            reader = pd.read_csv(io.BufferedReader(BoundedReader(f, end)), header=None, names=state['columns'], usecols=SUBMISSION_COLUMNS,
+                                 dtype=SUBMISSION_DTYPES, chunksize=chunk_size)
+            for chunk in reader:
+                chunk['Timestamp'] = parse_timestamps(chunk['Timestamp'])
+                yield chunk
+        return
+
+    # Snapshot the watermark: advance_watermark() moves it while chunks are folded
+    watermark = state['watermark']
+    seen = set(state['watermark_rows'])
+    with open(path, 'rb') as f:
+        reader = pd.read_csv(io.BufferedReader(BoundedReader(f, end)), usecols=SUBMISSION_COLUMNS,
+                             dtype=SUBMISSION_DTYPES, chunksize=chunk_size)
+        for chunk in reader:
+            chunk['Timestamp'] = parse_timestamps(chunk['Timestamp'])
+            if watermark is None:
+                yield chunk
+                continue
+
+            keep = chunk['Timestamp'] > watermark
+            at_watermark = chunk['Timestamp'] == watermark
+            if at_watermark.any():
+                rows = chunk.loc[at_watermark, SUBMISSION_COLUMNS].itertuples(index=False, name=None)
+                keep[at_watermark] = [row not in seen for row in rows]
+            yield chunk[keep]
+
+def advance_watermark(state, chunk):
+    """Move the Timestamp watermark past a folded chunk"""
+    chunk_max = chunk['Timestamp'].max()
+    if pd.isna(chunk_max):
+        return
+    if state['watermark'] is None or chunk_max > state['watermark']:
+        state['watermark'] = chunk_max
+        state['watermark_rows'] = set()
+    if chunk_max == state['watermark']:
+        at_watermark = chunk.loc[chunk['Timestamp'] == chunk_max, SUBMISSION_COLUMNS]
+        state['watermark_rows'].update(at_watermark.itertuples(index=False, name=None))
+
+def refresh(chunk_size=REFRESH_CHUNK_SIZE, state_path=REFRESH_STATE_FILE, cache_dir=PARSE_CACHE_DIR):
+    """
+    Update player_data.csv from submissions newer than the stored watermark
+
+    Only players with new submissions get their rows rebuilt. A change to the
+    user list, the scoreboard or the challenge count rebuilds every row from the
+    stored aggregates, which is still independent of the submission history.
+    """
     print("=" * 70)
-    print("CTF DATA PROCESSOR - Individual Player Wrapped Data Generator")
+    print("CTF DATA PROCESSOR - Incremental Refresh")
     print("=" * 70)
 
-    # Read CSV files
+    settings = (REFRESH_STATE_VERSION, TIMESTAMP_FORMAT, TIMESTAMP_TZ)
+    state = load_refresh_state(state_path)
+    if state is not None and state.get('settings') != settings:
+        print("\n♻️  Refresh state is from other settings - discarding it")
+        state = None
+
+    if state is None:
+        print("\n🆕 No refresh state yet - folding the full submission history")
+        state = {
+            'settings': settings,
+            'aggregator': vars(SubmissionAggregator()),
+            'watermark': None,
+            'watermark_rows': set(),
+            'offset': 0,
+            'tail': b'',
+            'columns': None,
+            'inputs': None,
+            'output': None,
+        }
+    else:
+        print(f"\n⏱️  Watermark: {pd.Timestamp(state['watermark'])}")
+
     print("\n📂 Reading CSV files...")
     try:
-        users_df = pd.read_csv(USERS_CSV)
-        submissions_df = pd.read_csv(SUBMISSIONS_CSV)
-        scoreboard_df = pd.read_csv(SCOREBOARD_CSV)
-        print(f"  ✓ Users: {len(users_df)} rows")
-        print(f"  ✓ Submissions: {len(submissions_df)} rows")
-        print(f"  ✓ Scoreboard: {len(scoreboard_df)} rows")
+        users_df = read_csv_cached(USERS_CSV, cache_dir=cache_dir, dtype=USER_DTYPES)
+        scoreboard_df = read_csv_cached(SCOREBOARD_CSV, cache_dir=cache_dir)
+        challenge_index = load_challenge_index(CHALLENGES_CSV)
+        challenges_digest = write_pool.file_digest(CHALLENGES_CSV) if challenge_index is not None else None
+        inputs = (write_pool.file_digest(USERS_CSV), write_pool.file_digest(SCOREBOARD_CSV), challenges_digest,
+                  RANK_MODE, PACING_ARCHETYPES, FAV_CATEGORY_BASIS)
+
+        # Aggregator fields are stored as plain data so the state loads from any entry point
+        aggregator = SubmissionAggregator()
+        aggregator.__dict__.update(state['aggregator'])
+        affected = set()
+        new_rows = 0
+        # Rows past the last newline may still be being written by the exporter
+        end = complete_length(SUBMISSIONS_CSV)
+        for chunk in read_new_submissions(SUBMISSIONS_CSV, state, chunk_size, end):
+            if len(chunk) == 0:
+                continue
+            aggregator.add(chunk)
+            advance_watermark(state, chunk)
+            affected.update(chunk['Username'].dropna())
+            new_rows += len(chunk)
+
+        state['columns'] = list(pd.read_csv(SUBMISSIONS_CSV, nrows=0, dtype=SUBMISSION_DTYPES).columns)
+        state['offset'] = end
+        with open(SUBMISSIONS_CSV, 'rb') as f:
+            f.seek(max(0, end - 4096))
+            state['tail'] = f.read(end - f.tell())
+        print(f"  ✓ New submissions: {new_rows} rows from {len(affected)} users")
     except Exception as e:
         print(f"  ❌ Error reading CSV files: {e}")
         return
 
-    # Filter to only PLAYER role (exclude ADMIN, ORGANIZER)
-    print("\n🎯 Filtering players...")
     players_df = users_df[users_df['Role'] == 'PLAYER'].copy()
-    print(f"  ✓ Found {len(players_df)} players (excluding admins/organizers)")
+    aggregates = finish_aggregates(aggregator.result(), aggregator.solved, aggregator.attempts, challenge_index)
+    total_challenges = len(aggregator.challenges)
 
-    # Calculate total available challenges
-    unique_challenges = submissions_df['Challenge'].unique()
-    total_challenges = len(unique_challenges)
-    print(f"\n📊 Total challenges in CTF: {total_challenges}")
+    output_df = state['output']
+    full_rebuild = (
+        output_df is None
+        or state['inputs'] != inputs
+        or (output_df['Total_Available'] != total_challenges).any()
+    )
 
-    # Process each player
-    print("\n🔄 Processing individual player statistics...")
+    print("\n🔄 Updating player statistics...")
     print("-" * 70)
+    if full_rebuild:
+        output_df = build_player_stats(players_df, aggregates, scoreboard_df, total_challenges)
+        updated = len(output_df)
+    else:
+        changed = output_df['Username'].isin(affected)
+        updated = int(changed.sum())
+        if updated:
+            changed_players = players_df[players_df['Username'].isin(affected)]
+            rows_df = build_player_stats(changed_players, aggregates, scoreboard_df, total_challenges)
+            rows_df.index = output_df.index[changed]
+            output_df = output_df.copy()
+            output_df.loc[changed] = rows_df
 
-    player_stats = []
+            if RANK_MODE != "team":
+                # Individual ranks are relative to every player, so re-rank them all
+                merged = players_df.join(aggregates, on='Username')
+                output_df['Rank'] = compute_rank_display(merged, scoreboard_df).to_numpy()
+    print("-" * 70)
 
-    for _, player in players_df.iterrows():
-        username = player['Username']
-        email = player['Email']
-        team = player['Team'] if pd.notna(player['Team']) else 'No Team'
+    if updated or state['output'] is None:
+        output_df.to_csv(OUTPUT_CSV, index=False)
+    state['inputs'] = inputs
+    state['aggregator'] = vars(aggregator)
+    state['output'] = output_df
+    save_refresh_state(state, state_path)
 
-        # Get this player's submissions
-        player_submissions = submissions_df[submissions_df['Username'] == username]
+    print(f"\n💾 Updated {updated} of {len(output_df)} players in {OUTPUT_CSV}")
+    print_parse_summary()
+    print("\n" + "=" * 70)
+    print("✅ REFRESH COMPLETE!")
+    print("=" * 70)
 
-        # Count correct and incorrect submissions
-        correct = player_submissions[player_submissions['Correct'] == 'Yes']
-        incorrect = player_submissions[player_submissions['Correct'] == 'No']
+# ============================================
+# EVENT PIPELINE
+# ============================================
 
-        total_solved = len(correct['Challenge'].unique())  # Unique challenges solved
-        correct_submissions = len(correct)
-        incorrect_submissions = len(incorrect)
-        total_submissions = correct_submissions + incorrect_submissions
+class ExportReadError(Exception):
+    """An event's CSV exports could not be read or parsed"""
 
-        # Calculate completion percentage
-        completion_percent = (total_solved / total_challenges * 100) if total_challenges > 0 else 0
+def process_event(users_csv, submissions_csv, scoreboard_csv, output_csv,
+                  chunk_size=SUBMISSIONS_CHUNK_SIZE, cache_dir=PARSE_CACHE_DIR, challenges_csv=None):
+    """
+    Run the full pipeline for one event's exports
 
-        # Calculate total points
-        total_points = correct['Points Awarded'].sum()
+    Returns:
+        The player_data DataFrame (also written to output_csv unless it is None)
 
-        # Get time spent (calculate from first to last submission)
-        if len(player_submissions) > 0:
-            player_submissions['Timestamp'] = pd.to_datetime(player_submissions['Timestamp'])
-            first_sub = player_submissions['Timestamp'].min()
-            last_sub = player_submissions['Timestamp'].max()
-            time_diff = last_sub - first_sub
-            hours = int(time_diff.total_seconds() // 3600)
-            minutes = int((time_diff.total_seconds() % 3600) // 60)
-            time_display = f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m"
-        else:
-            time_display = "0m"
-
-        # Get most attempted category (favorite category)
-        if len(player_submissions) > 0:
-            # Try to extract category from challenge name (rough approximation)
-            # You might need to adjust this based on your challenge naming
-            challenge_names = player_submissions['Challenge'].tolist()
-            if len(challenge_names) > 0:
-                fav_category = challenge_names[0]  # First challenge as placeholder
-                # Better: parse actual categories if available
-            else:
-                fav_category = "General"
+    Raises:
+        ExportReadError: The exports could not be read
+    """
+    # Read CSV files
+    print("\n📂 Reading CSV files...")
+    try:
+        users_df = read_csv_cached(users_csv, cache_dir=cache_dir, dtype=USER_DTYPES)
+        challenge_index = load_challenge_index(challenges_csv)
+        aggregates, total_challenges, submission_rows = load_submission_aggregates(
+            submissions_csv, chunk_size, cache_dir, challenge_index)
+        scoreboard_df = read_csv_cached(scoreboard_csv, cache_dir=cache_dir)
+        print(f"  ✓ Users: {len(users_df)} rows")
+        if chunk_size:
+            print(f"  ✓ Submissions: {submission_rows} rows (streamed in chunks of {chunk_size})")
         else:
-            fav_category = "None"
-
-        # Get team rank (if team is in scoreboard)
-        team_rank = None
-        if team != 'No Team':
-            team_score_row = scoreboard_df[scoreboard_df['Team'] == team]
-            if len(team_score_row) > 0:
-                team_rank = int(team_score_row.iloc[0]['Rank'])
-
-        if team_rank is None:
-            # If no team or team not ranked, use individual score-based rank
-            # (This is a rough estimate - you might want to refine)
-            rank_display = "N/A"
+            print(f"  ✓ Submissions: {submission_rows} rows")
+        print(f"  ✓ Scoreboard: {len(scoreboard_df)} rows")
+        if challenge_index is not None:
+            categories = challenge_index['Category'].nunique()
+            print(f"  ✓ Challenges: {len(challenge_index)} rows ({categories} categories)")
         else:
-            rank_display = str(team_rank)
-
-        # Calculate archetype
-        stats_dict = {
-            'total_solved': total_solved,
-            'total_available': total_challenges,
-            'completion_percent': completion_percent,
-            'correct_submissions': correct_submissions,
-            'incorrect_submissions': incorrect_submissions
-        }
-        archetype = calculate_archetype(stats_dict)
-
-        # Determine badges (simplified)
-        badges = []
-        if completion_percent == 100:
-            badges.append("perfect_score")
-        if total_solved > 0 and time_diff.total_seconds() < 7200:  # Solved in under 2 hours
-            badges.append("speed_demon")
-
-        badges_str = ','.join(badges) if badges else ""
-
-        # Store player data
-        player_stats.append({
-            'Username': username,
-            'Email': email,
-            'Archetype': archetype,
-            'Total_Solved': total_solved,
-            'Total_Available': total_challenges,
-            'Rank': rank_display,
-            'Time_Display': time_display,
-            'Fav_Category': fav_category,
-            'Badges': badges_str
-        })
-
-        print(f"  ✓ {username:20s} | {archetype:25s} | Solved: {total_solved}/{total_challenges}")
+            print("  • No challenge metadata - Fav_Category uses the first challenge touched")
+    except Exception as e:
+        raise ExportReadError(f"Error reading CSV files: {e}") from e
 
+    # Filter to only PLAYER role (exclude ADMIN, ORGANIZER)
+    print("\n🎯 Filtering players...")
+    players_df = users_df[users_df['Role'] == 'PLAYER'].copy()
+    print(f"  ✓ Found {len(players_df)} players (excluding admins/organizers)")
+
+    # Total available challenges (every challenge seen in submissions)
+    print(f"\n📊 Total challenges in CTF: {total_challenges}")
+
+    # Build each player's row from the aggregated submissions
+    print("\n🔄 Processing individual player statistics...")
     print("-" * 70)
 
-    # Create DataFrame and save
-    print(f"\n💾 Saving player data...")
-    output_df = pd.DataFrame(player_stats)
-    output_df.to_csv(OUTPUT_CSV, index=False)
-    print(f"  ✓ Saved to: {OUTPUT_CSV}")
+    output_df = build_player_stats(players_df, aggregates, scoreboard_df, total_challenges)
+
+    print("-" * 70)
+
+    # Save
+    if output_csv:
+        print(f"\n💾 Saving player data...")
+        output_df.to_csv(output_csv, index=False)
+        print(f"  ✓ Saved to: {output_csv}")
     print(f"  ✓ Total players: {len(output_df)}")
 
     # Summary statistics
@@ -210,6 +1004,160 @@ def main():
     for archetype, count in archetype_counts.items():
         print(f"  • {archetype:25s}: {count:3d} players")
 
+    print_parse_summary()
+    return output_df
+
+# ============================================
+# BATCH MODE (multiple events)
+# ============================================
+
+def read_manifest(path):
+    """
+    Read a batch manifest: one event directory per line, '#' starts a comment.
+    Relative directories are resolved against the manifest's folder.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    events = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                events.append(os.path.normpath(os.path.join(base, line)))
+    return events
+
+def run_event(event_dir, settings):
+    """
+    Process one event directory inside a batch worker
+
+    settings['globals'] carries the parent's --pacing, --rank-mode, ... values,
+    which a spawned worker would otherwise reset to the module defaults. The
+    event's console output goes to EVENT_LOG in its directory so parallel
+    events don't interleave.
+
+    Returns:
+        Dict with event, ok, seconds, rows and error
+    """
+    globals().update(settings['globals'])
+    PARSE_STATS.update(rows=0, seconds=0.0, failed=0)
+
+    start = time.perf_counter()
+    log = io.StringIO()
+    output_df = None
+    error = None
+    try:
+        with contextlib.redirect_stdout(log):
+            output_df = process_event(
+                os.path.join(event_dir, EVENT_USERS_CSV),
+                os.path.join(event_dir, EVENT_SUBMISSIONS_CSV),
+                os.path.join(event_dir, EVENT_SCOREBOARD_CSV),
+                os.path.join(event_dir, EVENT_OUTPUT_CSV),
+                challenges_csv=os.path.join(event_dir, EVENT_CHALLENGES_CSV),
+                chunk_size=settings['chunk_size'],
+                cache_dir=os.path.join(event_dir, ".ctf_cache") if settings['cache'] else None,
+            )
+    except ExportReadError as e:
+        log.write(f"  ❌ {e}\n")
+        error = str(e)
+    except Exception as e:
+        log.write(traceback.format_exc())
+        error = f"{type(e).__name__}: {e}"
+
+    try:
+        with open(os.path.join(event_dir, EVENT_LOG), 'w', encoding='utf-8') as f:
+            f.write(log.getvalue())
+    except OSError:
+        pass
+
+    return {
+        'event': event_dir,
+        'ok': error is None,
+        'seconds': time.perf_counter() - start,
+        'rows': len(output_df) if output_df is not None else 0,
+        'error': error,
+    }
+
+def run_batch(manifest_path, workers=None, chunk_size=SUBMISSIONS_CHUNK_SIZE, cache=True):
+    """Process every event in a manifest across a pool of worker processes"""
+    print("=" * 70)
+    print("CTF DATA PROCESSOR - Batch Mode")
+    print("=" * 70)
+
+    try:
+        events = read_manifest(manifest_path)
+    except OSError as e:
+        print(f"  ❌ Error reading manifest: {e}")
+        return
+    if not events:
+        print(f"  ⚠️  No event directories listed in {manifest_path}")
+        return
+
+    workers = min(workers or os.cpu_count() or 1, len(events))
+    print(f"\n🚀 Processing {len(events)} events with {workers} workers...")
+    print("-" * 70)
+
+    settings = {
+        'globals': {
+            'TIMESTAMP_FORMAT': TIMESTAMP_FORMAT,
+            'TIMESTAMP_TZ': TIMESTAMP_TZ,
+            'RANK_MODE': RANK_MODE,
+            'PACING_ARCHETYPES': PACING_ARCHETYPES,
+            'FAV_CATEGORY_BASIS': FAV_CATEGORY_BASIS,
+        },
+        'chunk_size': chunk_size,
+        'cache': cache,
+    }
+
+    start = time.perf_counter()
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_event, event, settings): event for event in events}
+        for future in as_completed(futures):
+            event = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. killed for memory) - keep going
+                result = {'event': event, 'ok': False, 'seconds': 0.0, 'rows': 0,
+                          'error': f"{type(e).__name__}: {e}"}
+            results[event] = result
+            status = "✓" if result['ok'] else "❌"
+            print(f"  {status} {os.path.basename(event)}")
+    elapsed = time.perf_counter() - start
+
+    print("-" * 70)
+    print(f"\n📋 BATCH SUMMARY:")
+    print(f"  {'EVENT':30s} {'STATUS':8s} {'TIME':>9s} {'PLAYERS':>8s}")
+    for event in events:
+        result = results[event]
+        status = "OK" if result['ok'] else "FAILED"
+        print(f"  {os.path.basename(event)[:30]:30s} {status:8s} {result['seconds']:8.2f}s {result['rows']:8d}")
+        if not result['ok']:
+            print(f"      ↳ {result['error']}")
+
+    failed = sum(1 for result in results.values() if not result['ok'])
+    print("\n" + "=" * 70)
+    if failed:
+        print(f"⚠️  {len(events) - failed}/{len(events)} events processed, {failed} failed ({elapsed:.2f}s)")
+    else:
+        print(f"✅ All {len(events)} events processed in {elapsed:.2f}s")
+    print("=" * 70)
+
+# ============================================
+# MAIN PROCESSING
+# ============================================
+
+def main(chunk_size=SUBMISSIONS_CHUNK_SIZE, cache_dir=PARSE_CACHE_DIR):
+    print("=" * 70)
+    print("CTF DATA PROCESSOR - Individual Player Wrapped Data Generator")
+    print("=" * 70)
+
+    try:
+        process_event(USERS_CSV, SUBMISSIONS_CSV, SCOREBOARD_CSV, OUTPUT_CSV,
+                      chunk_size, cache_dir, challenges_csv=CHALLENGES_CSV)
+    except ExportReadError as e:
+        print(f"  ❌ {e}")
+        return
+
     print("\n" + "=" * 70)
     print("✅ COMPLETE! player_data.csv is ready for card/HTML generation!")
     print("=" * 70)
@@ -222,4 +1170,40 @@ def main():
     print("=" * 70)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Generate player_data.csv from CTF exports")
+    parser.add_argument("--chunk-size", type=int, default=SUBMISSIONS_CHUNK_SIZE,
+                        help="stream the submissions CSV in chunks of this many rows")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always re-parse the CSV exports instead of using cached snapshots")
+    parser.add_argument("--refresh", action="store_true",
+                        help="only fold submissions newer than the stored watermark into player_data.csv")
+    parser.add_argument("--timestamp-format", default=TIMESTAMP_FORMAT,
+                        help="strftime format of the submission Timestamp column (default: ISO8601)")
+    parser.add_argument("--timezone", default=TIMESTAMP_TZ,
+                        help="timezone of naive submission timestamps, e.g. Asia/Kolkata")
+    parser.add_argument("--rank-mode", choices=["team", "individual", "team_or_individual"], default=RANK_MODE,
+                        help="how the Rank column is computed (default: team)")
+    parser.add_argument("--pacing", action="store_true",
+                        help="let solve-timeline pacing refine archetypes (Slow Burn detection)")
+    parser.add_argument("--challenges", default=CHALLENGES_CSV,
+                        help="challenge metadata CSV (Challenge, Category, Points) for favorite categories")
+    parser.add_argument("--fav-category", choices=["attempted", "solved"], default=FAV_CATEGORY_BASIS,
+                        help="pick each player's most attempted or most solved category")
+    parser.add_argument("--batch", metavar="MANIFEST",
+                        help="process every event directory listed in MANIFEST in parallel")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for --batch (default: CPU count)")
+    args = parser.parse_args()
+    TIMESTAMP_FORMAT = args.timestamp_format
+    TIMESTAMP_TZ = args.timezone
+    RANK_MODE = args.rank_mode
+    PACING_ARCHETYPES = args.pacing or PACING_ARCHETYPES
+    CHALLENGES_CSV = args.challenges
+    FAV_CATEGORY_BASIS = args.fav_category
+    cache_dir = None if args.no_cache else PARSE_CACHE_DIR
+    if args.batch:
+        run_batch(args.batch, workers=args.workers, chunk_size=args.chunk_size, cache=not args.no_cache)
+    elif args.refresh:
+        refresh(chunk_size=args.chunk_size or REFRESH_CHUNK_SIZE, cache_dir=cache_dir)
+    else:
+        main(chunk_size=args.chunk_size, cache_dir=cache_dir)
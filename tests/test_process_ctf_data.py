@@ -0,0 +1,51 @@
+"""Streaming aggregation must match the in-memory path (python -m pytest tests)"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import process_ctf_data as data
+
+USERS = """Username,Email,Team,Role
+alice,alice@x.com,No Team,PLAYER
+1337,leet@x.com,No Team,PLAYER
+42,answer@x.com,No Team,PLAYER
+"""
+
+# Numeric-looking usernames and challenge names; with small chunk sizes some
+# chunks contain nothing else
+SUBMISSIONS = """Username,Challenge,Correct,Points Awarded,Timestamp
+alice,1,No,0,2026-02-14 10:00:00
+alice,1,Yes,100,2026-02-14 10:05:00
+1337,2,No,0,2026-02-14 10:10:00
+1337,1,Yes,100,2026-02-14 11:00:00
+1337,2,Yes,100,2026-02-14 12:39:00
+42,10,Yes,100,2026-02-14 13:00:00
+42,1,No,0,2026-02-14 13:30:00
+"""
+
+SCOREBOARD = """Rank,Team,Score
+"""
+
+@pytest.fixture
+def exports(tmp_path):
+    paths = []
+    for name, content in (("users.csv", USERS), ("submissions.csv", SUBMISSIONS), ("scoreboard.csv", SCOREBOARD)):
+        path = tmp_path / name
+        path.write_text(content, encoding='utf-8')
+        paths.append(str(path))
+    return paths
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3])
+def test_streaming_matches_in_memory(exports, chunk_size):
+    in_memory = data.process_event(*exports, None, chunk_size=None, cache_dir=None)
+    streamed = data.process_event(*exports, None, chunk_size=chunk_size, cache_dir=None)
+
+    pd.testing.assert_frame_equal(streamed, in_memory)
+    leet = streamed.set_index('Username').loc['1337']
+    assert leet['Total_Solved'] == 2
+    assert leet['Total_Available'] == 3
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+CTF Wrapped Write Pool
+Bounded thread pool for the build's file writes. Rendering stays on the
+calling thread, in order; finished bytes are handed off here so per-file
+latency (network-mounted build folders) overlaps with the next render.
+Also holds the file helpers the build scripts share (digests, manifests).
+"""
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+WRITE_THREADS = 8
+
+# Backpressure: submit() blocks while this many files or bytes are queued
+MAX_PENDING_FILES = 64
+MAX_PENDING_BYTES = 32 * 1024 * 1024
+
+# ============================================
+# WRITE POOL
+# ============================================
+
+class WritePool:
+    """
+    Thread pool for file writes with bounded pending work
+
+    Failures never raise on the caller's thread; they are collected per file
+    as (tag, path, error) and returned by close(). With threads=0 every job
+    runs synchronously on the caller's thread, with the same error handling.
+    """
+
+    def __init__(self, threads=WRITE_THREADS, max_files=MAX_PENDING_FILES, max_bytes=MAX_PENDING_BYTES):
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="write") if threads else None
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.pending_files = 0
+        self.pending_bytes = 0
+        self.available = threading.Condition()
+        self.failures = []
+        self.written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, path, data, tag=None):
+        """
+        Write bytes (or UTF-8 text) to path
+
+        Args:
+            path: Destination file, overwritten
+            data: bytes, or str written in text mode exactly like open(path, 'w')
+            tag: Owner reported with a failure (e.g. the username)
+        """
+        self.submit(path, _write_file, path, data, size=len(data), tag=tag)
+
+    def submit(self, path, func, *args, size=0, tag=None):
+        """
+        Run func(*args) on the pool as the job producing path
+
+        Blocks while MAX_PENDING_FILES / MAX_PENDING_BYTES are already
+        queued; a single job larger than max_bytes is let through alone.
+        """
+        if self.executor is None:
+            self._run(path, tag, func, args)
+            return
+        with self.available:
+            while self.pending_files and (self.pending_files >= self.max_files
+                                          or self.pending_bytes + size > self.max_bytes):
+                self.available.wait()
+            self.pending_files += 1
+            self.pending_bytes += size
+        future = self.executor.submit(self._run, path, tag, func, args)
+        future.add_done_callback(lambda _: self._release(size))
+
+    def _run(self, path, tag, func, args):
+        try:
+            func(*args)
+        except Exception as e:
+            with self.available:
+                self.failures.append((tag, path, f"{type(e).__name__}: {e}"))
+            return
+        with self.available:
+            self.written += 1
+
+    def _release(self, size):
+        with self.available:
+            self.pending_files -= 1
+            self.pending_bytes -= size
+            self.available.notify_all()
+
+    def close(self):
+        """
+        Wait for every queued write
+
+        Returns:
+            List of (tag, path, error) for the writes that failed
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+        return self.failures
+
+# ============================================
+# SHARED FILE HELPERS
+# ============================================
+
+def replace_file(path, write):
+    """
+    Call write(tmp_path), then rename the result over path
+
+    Readers never see a partial file, and a file hardlinked to path (a
+    published card) keeps its old contents instead of being truncated.
+    """
+    tmp_path = path + ".tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _write_file(path, data):
+    def write(tmp_path):
+        if isinstance(data, str):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+        else:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+    replace_file(path, write)
+
+def file_digest(path):
+    """SHA-256 of a file's contents, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest(path):
+    """JSON build manifest, or {} if it is missing or unreadable"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(path, manifest):
+    """Write a JSON build manifest atomically"""
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+    replace_file(path, write)